@@ -0,0 +1,42 @@
+"""add pipeline change tracking columns
+
+Revision ID: 202610190900
+Revises: 202602111430
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610190900"
+down_revision: Union[str, None] = "202602111430"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("hobbies_changed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("users", sa.Column("context_changed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("users", sa.Column("hobbies_parsed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("users", sa.Column("newsletter_drafted_at", sa.DateTime(timezone=True), nullable=True))
+    op.execute("UPDATE users SET hobbies_changed_at = updated_at, context_changed_at = updated_at")
+
+    op.add_column("hobby_city_pairs", sa.Column("results_fingerprint", sa.String(length=64), nullable=True))
+    op.add_column("hobby_city_pairs", sa.Column("events_changed_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("city_venues", sa.Column("results_fingerprint", sa.String(length=64), nullable=True))
+    op.add_column("city_venues", sa.Column("events_changed_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("city_venues", "events_changed_at")
+    op.drop_column("city_venues", "results_fingerprint")
+    op.drop_column("hobby_city_pairs", "events_changed_at")
+    op.drop_column("hobby_city_pairs", "results_fingerprint")
+
+    op.drop_column("users", "newsletter_drafted_at")
+    op.drop_column("users", "hobbies_parsed_at")
+    op.drop_column("users", "context_changed_at")
+    op.drop_column("users", "hobbies_changed_at")
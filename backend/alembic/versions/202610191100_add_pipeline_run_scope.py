@@ -0,0 +1,29 @@
+"""add scope and run group to pipeline runs
+
+Revision ID: 202610191100
+Revises: 202610191000
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191100"
+down_revision: Union[str, None] = "202610191000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("pipeline_runs", sa.Column("scope", sa.String(length=120), server_default="all", nullable=False))
+    op.add_column("pipeline_runs", sa.Column("run_group", sa.String(length=64), nullable=True))
+    op.create_index("ix_pipeline_runs_run_group", "pipeline_runs", ["run_group"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_pipeline_runs_run_group", table_name="pipeline_runs")
+    op.drop_column("pipeline_runs", "run_group")
+    op.drop_column("pipeline_runs", "scope")
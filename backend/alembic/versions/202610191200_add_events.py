@@ -0,0 +1,50 @@
+"""add normalized events table
+
+Revision ID: 202610191200
+Revises: 202610191100
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191200"
+down_revision: Union[str, None] = "202610191100"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "events",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("city", sa.String(length=120), nullable=False),
+        sa.Column("name", sa.String(length=300), nullable=False),
+        sa.Column("start_time", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("venue", sa.String(length=240), nullable=True),
+        sa.Column("price_tier", sa.String(length=10), nullable=False),
+        sa.Column("category", sa.String(length=60), nullable=False),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("source", sa.String(length=20), nullable=False),
+        sa.Column("source_key", sa.String(length=64), nullable=False),
+        sa.Column("fingerprint", sa.String(length=64), nullable=False),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("city", "fingerprint", name="uq_events_city_fingerprint"),
+    )
+    op.create_index("ix_events_city_start_time", "events", ["city", "start_time"], unique=False)
+    op.create_index("ix_events_city_category", "events", ["city", "category"], unique=False)
+    op.create_index("ix_events_source_key", "events", ["source_key"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_source_key", table_name="events")
+    op.drop_index("ix_events_city_category", table_name="events")
+    op.drop_index("ix_events_city_start_time", table_name="events")
+    op.drop_table("events")
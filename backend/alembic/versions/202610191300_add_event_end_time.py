@@ -0,0 +1,25 @@
+"""add end time to events
+
+Revision ID: 202610191300
+Revises: 202610191200
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191300"
+down_revision: Union[str, None] = "202610191200"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("end_time", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("events", "end_time")
@@ -0,0 +1,49 @@
+"""add composite indexes for hot lookup paths
+
+Revision ID: 202610191400
+Revises: 202610191300
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191400"
+down_revision: Union[str, None] = "202610191300"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns, partial predicate)
+INDEXES = (
+    ("ix_user_hobbies_user_created_at", "user_hobbies", ["user_id", sa.text("created_at DESC")], None),
+    ("ix_user_goals_user_created_at", "user_goals", ["user_id", sa.text("created_at DESC")], None),
+    ("ix_oauth_tokens_user_provider", "oauth_tokens", ["user_id", "provider"], None),
+    ("ix_newsletters_user_created_at", "newsletters", ["user_id", "created_at"], None),
+    ("ix_newsletters_unsent", "newsletters", ["id"], "sent_at IS NULL"),
+    ("ix_hobby_city_pairs_city_frequency", "hobby_city_pairs", ["city", sa.text("frequency DESC")], None),
+    ("ix_city_venues_city_type_name", "city_venues", ["city", "venue_type", "venue_name"], None),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, predicate in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(predicate) if predicate else None,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _predicate in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
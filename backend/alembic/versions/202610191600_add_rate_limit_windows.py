@@ -0,0 +1,34 @@
+"""add shared rate limit windows
+
+Revision ID: 202610191600
+Revises: 202610191500
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191600"
+down_revision: Union[str, None] = "202610191500"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_windows",
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("window_start", sa.BigInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key", "window_start"),
+    )
+    op.create_index("ix_rate_limit_windows_expires_at", "rate_limit_windows", ["expires_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_rate_limit_windows_expires_at", table_name="rate_limit_windows")
+    op.drop_table("rate_limit_windows")
@@ -0,0 +1,75 @@
+"""add city registry and re-key pairs to canonical cities
+
+Revision ID: 202610191700
+Revises: 202610191600
+Create Date: 2026-10-19 17:00:00.000000
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191700"
+down_revision: Union[str, None] = "202610191600"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEED_CITIES = (
+    ("austin", "Austin", ["austin tx", "austin texas", "atx"]),
+    ("san antonio", "San Antonio", ["san antonio tx", "san antonio texas", "satx"]),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "cities",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("slug", sa.String(length=120), nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.Column("region", sa.String(length=120), nullable=True),
+        sa.Column("timezone", sa.String(length=60), nullable=False),
+        sa.Column("aliases", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("is_pilot", sa.Boolean(), server_default="false", nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("slug"),
+    )
+    for slug, name, aliases in SEED_CITIES:
+        op.execute(
+            f"INSERT INTO cities (id, slug, name, region, timezone, aliases, is_pilot) "
+            f"VALUES (gen_random_uuid(), '{slug}', '{name}', 'Texas', 'America/Chicago', '{json.dumps(aliases)}'::jsonb, true)"
+        )
+
+    # Pairs used to be keyed by the raw lowercased user city; fold known spellings into the
+    # canonical slug and merge the duplicate pairs that produces.
+    for slug, name, aliases in SEED_CITIES:
+        spellings = sorted({*aliases, f"{slug}, tx", f"{slug}, texas", f"{slug}."} - {slug})
+        quoted = ", ".join(f"'{spelling}'" for spelling in spellings)
+        op.execute(f"UPDATE hobby_city_pairs SET city = '{slug}' WHERE city IN ({quoted})")
+    op.execute(
+        """
+        WITH ranked AS (
+            SELECT id,
+                   SUM(frequency) OVER (PARTITION BY hobby_tag_id, city) AS total,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY hobby_tag_id, city ORDER BY last_searched DESC NULLS LAST, id
+                   ) AS position
+            FROM hobby_city_pairs
+        ),
+        merged AS (
+            UPDATE hobby_city_pairs SET frequency = ranked.total
+            FROM ranked
+            WHERE hobby_city_pairs.id = ranked.id AND ranked.position = 1
+        )
+        DELETE FROM hobby_city_pairs USING ranked
+        WHERE hobby_city_pairs.id = ranked.id AND ranked.position > 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("cities")
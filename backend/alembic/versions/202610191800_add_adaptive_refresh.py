@@ -0,0 +1,57 @@
+"""add adaptive refresh scheduling columns
+
+Revision ID: 202610191800
+Revises: 202610191700
+Create Date: 2026-10-19 18:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191800"
+down_revision: Union[str, None] = "202610191700"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("hobby_city_pairs", "city_venues"):
+        op.add_column(table, sa.Column("refresh_interval_seconds", sa.Integer(), nullable=True))
+        op.add_column(table, sa.Column("next_refresh_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("cities", sa.Column("venues_fingerprint", sa.String(length=64), nullable=True))
+    op.add_column("cities", sa.Column("venue_refresh_interval_seconds", sa.Integer(), nullable=True))
+    op.add_column("cities", sa.Column("next_venue_discovery_at", sa.DateTime(timezone=True), nullable=True))
+
+    # Existing rows keep the old fixed windows until their next refresh starts adapting them.
+    op.execute(
+        "UPDATE hobby_city_pairs SET refresh_interval_seconds = 86400, "
+        "next_refresh_at = last_searched + interval '1 day' WHERE last_searched IS NOT NULL"
+    )
+    op.execute(
+        "UPDATE city_venues SET refresh_interval_seconds = 518400, "
+        "next_refresh_at = last_events_searched + interval '6 days' WHERE last_events_searched IS NOT NULL"
+    )
+    op.execute(
+        """
+        UPDATE cities SET venue_refresh_interval_seconds = 2592000,
+            next_venue_discovery_at = discovered.last_searched + interval '30 days'
+        FROM (
+            SELECT city, max(last_searched) AS last_searched FROM city_venues
+            WHERE venue_type = 'music' AND last_searched IS NOT NULL
+            GROUP BY city
+        ) AS discovered
+        WHERE discovered.city = cities.slug
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("cities", "next_venue_discovery_at")
+    op.drop_column("cities", "venue_refresh_interval_seconds")
+    op.drop_column("cities", "venues_fingerprint")
+    for table in ("city_venues", "hobby_city_pairs"):
+        op.drop_column(table, "next_refresh_at")
+        op.drop_column(table, "refresh_interval_seconds")
@@ -0,0 +1,29 @@
+"""add coordinates to venues and events
+
+Revision ID: 202610191900
+Revises: 202610191800
+Create Date: 2026-10-19 19:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610191900"
+down_revision: Union[str, None] = "202610191800"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ("city_venues", "events"):
+        op.add_column(table, sa.Column("lat", sa.Float(), nullable=True))
+        op.add_column(table, sa.Column("lng", sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    for table in ("events", "city_venues"):
+        op.drop_column(table, "lng")
+        op.drop_column(table, "lat")
@@ -0,0 +1,34 @@
+"""add geocoding cache
+
+Revision ID: 202610192000
+Revises: 202610191900
+Create Date: 2026-10-19 20:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "202610192000"
+down_revision: Union[str, None] = "202610191900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geocoded_addresses",
+        sa.Column("city", sa.String(length=120), nullable=False),
+        sa.Column("query", sa.String(length=300), nullable=False),
+        sa.Column("lat", sa.Float(), nullable=True),
+        sa.Column("lng", sa.Float(), nullable=True),
+        sa.Column("provider", sa.String(length=40), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("city", "query"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("geocoded_addresses")
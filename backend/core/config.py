@@ -22,6 +22,15 @@ class Settings(BaseSettings):
 
     database_url: str = Field(alias="DATABASE_URL")
     database_url_unpooled: str | None = Field(default=None, alias="DATABASE_URL_UNPOOLED")
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=5, ge=0)
+    db_pool_timeout_seconds: int = Field(default=10, ge=1)
+    pipeline_db_pool_size: int = Field(default=2, ge=1)
+    pipeline_db_max_overflow: int = Field(default=1, ge=0)
+    db_pool_recycle_seconds: int = Field(default=240, ge=30)
+    db_ping_after_idle_seconds: int = Field(default=60, ge=0)
+    db_warmup_on_startup: bool = False
+    db_warmup_connections: int = Field(default=1, ge=1)
 
     openrouter_api_key: str | None = Field(default=None, alias="OPENROUTER_API_KEY")
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
@@ -44,7 +53,28 @@ class Settings(BaseSettings):
     token_encryption_key: str | None = None
     api_cron_secret: str = "change-me"
 
+    pipeline_chunk_size: int = Field(default=500, ge=1)
+    city_registry_ttl_seconds: int = Field(default=300, ge=0)
+    event_index_ttl_seconds: int = Field(default=900, ge=0)
+    pipeline_lease_ttl_seconds: int = Field(default=900, ge=30)
+    venue_event_batch_size: int = Field(default=5, ge=1)
+    venue_event_search_workers: int = Field(default=4, ge=1)
+    pair_stale_grace_seconds: int = Field(default=172800, ge=0)
+    geocoding_provider: str = "gazetteer"
+    geocoding_miss_ttl_seconds: int = Field(default=2592000, ge=0)
+    # Weekly send slot in each city's local time (weekday 0 = Monday); refresh planning works back from it.
+    newsletter_send_weekday: int = Field(default=6, ge=0, le=6)
+    newsletter_send_hour: int = Field(default=8, ge=0, le=23)
+    job_batch_size: int = Field(default=10, ge=1)
+    job_max_attempts: int = Field(default=3, ge=1)
+    job_stale_after_seconds: int = Field(default=600, ge=60)
+
+    sql_slow_query_ms: int = Field(default=250, ge=0)
+    sql_repeat_threshold: int = Field(default=25, ge=2)
+
     rate_limit_signup: str = "10/minute"
+    # memory:// is per instance; use the database URL or redis:// to share counters.
+    rate_limit_storage_uri: str = "memory://"
     cors_origins: list[str] = Field(
         default_factory=lambda: ["http://localhost:3000", "https://itk-so.vercel.app"]
     )
@@ -1,5 +1,28 @@
+from fastapi import Request
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from starlette.concurrency import run_in_threadpool
 
-limiter = Limiter(key_func=get_remote_address)
+import core.rate_limit_storage  # noqa: F401  registers the postgresql:// storage scheme with limits
+from core.config import get_settings
 
+settings = get_settings()
+
+# If the shared storage is unreachable, fall back to per-instance counters instead of failing requests.
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy="sliding-window-counter",
+    storage_uri=settings.rate_limit_storage_uri,
+    in_memory_fallback_enabled=True,
+)
+
+
+async def check_rate_limit(request: Request) -> None:
+    """Route dependency that runs an async route's ``@limiter.limit`` check on a worker thread.
+
+    The shared storages (Postgres, Redis) are synchronous, so the decorator's own check would
+    block the event loop for a round trip; once this has run, the decorator skips it.
+    """
+    if limiter.enabled and not getattr(request.state, "_rate_limiting_complete", False):
+        await run_in_threadpool(limiter._check_request_limit, request, request.scope["endpoint"], False)
+        request.state._rate_limiting_complete = True
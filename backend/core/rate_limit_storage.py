@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Any
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+from sqlalchemy import Engine, create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.config import normalize_database_url
+
+# Fixed-window counters live in the row with window_start = 0; sliding-window rows are keyed by
+# the window index (epoch seconds // expiry), which is always positive.
+_FIXED_WINDOW = 0
+_PURGE_EVERY_HITS = 500
+
+_PREVIOUS_WEIGHTED = (
+    "COALESCE((SELECT previous.count FROM rate_limit_windows AS previous "
+    "WHERE previous.key = :key AND previous.window_start = :previous_window), 0) * :previous_weight"
+)
+_ACQUIRE_SLIDING_WINDOW = text(
+    f"""
+    INSERT INTO rate_limit_windows (key, window_start, count, expires_at)
+    SELECT :key, :current_window, :amount, to_timestamp(:expires_at)
+    WHERE floor({_PREVIOUS_WEIGHTED}) + :amount <= :limit
+    ON CONFLICT (key, window_start) DO UPDATE
+    SET count = rate_limit_windows.count + EXCLUDED.count
+    WHERE floor({_PREVIOUS_WEIGHTED} + rate_limit_windows.count) + EXCLUDED.count <= :limit
+    RETURNING count
+    """
+)
+_GET_SLIDING_WINDOW = text(
+    """
+    SELECT window_start, count FROM rate_limit_windows
+    WHERE key = :key AND window_start IN (:previous_window, :current_window)
+    """
+)
+_INCR_FIXED_WINDOW = text(
+    """
+    INSERT INTO rate_limit_windows (key, window_start, count, expires_at)
+    VALUES (:key, 0, :amount, to_timestamp(:expires_at))
+    ON CONFLICT (key, window_start) DO UPDATE
+    SET count = CASE WHEN rate_limit_windows.expires_at <= now() THEN EXCLUDED.count
+                     ELSE rate_limit_windows.count + EXCLUDED.count END,
+        expires_at = CASE WHEN rate_limit_windows.expires_at <= now() THEN EXCLUDED.expires_at
+                          ELSE rate_limit_windows.expires_at END
+    RETURNING count
+    """
+)
+
+
+class PostgresStorage(Storage, SlidingWindowCounterSupport):
+    """``limits`` storage backed by the ``rate_limit_windows`` table.
+
+    Every instance shares the same counters, so a limit holds across serverless instances.
+    A sliding-window hit is a single conditional upsert: the row lock taken by ``ON CONFLICT``
+    serializes concurrent hits on one key, and a refused hit writes nothing.
+
+    Selected with ``RATE_LIMIT_STORAGE_URI=postgresql://...``.
+    """
+
+    STORAGE_SCHEME = ["postgres", "postgresql", "postgresql+psycopg"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, **options: Any) -> None:
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self._uri = normalize_database_url(uri)
+        self._engine: Engine | None = None
+        self._engine_lock = threading.Lock()
+        self._hits = 0
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return SQLAlchemyError
+
+    @property
+    def engine(self) -> Engine:
+        # Connect lazily so building the limiter at import stays free.
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = create_engine(
+                        self._uri,
+                        pool_size=1,
+                        max_overflow=2,
+                        pool_recycle=240,
+                        connect_args={"prepare_threshold": None},
+                    )
+        return self._engine
+
+    def _scalar(self, statement: Any, **params: Any) -> Any:
+        with self.engine.begin() as connection:
+            return connection.execute(statement, params).scalar()
+
+    @staticmethod
+    def _windows(expiry: int, now: float) -> tuple[int, int, float]:
+        """(previous window, current window, share of the previous window still in range)."""
+        current_window = math.floor(now / expiry)
+        elapsed = now / expiry - current_window
+        return current_window - 1, current_window, 1 - elapsed
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_window, current_window, previous_weight = self._windows(expiry, now)
+        count = self._scalar(
+            _ACQUIRE_SLIDING_WINDOW,
+            key=key,
+            previous_window=previous_window,
+            current_window=current_window,
+            previous_weight=previous_weight,
+            amount=amount,
+            limit=limit,
+            expires_at=(current_window + 2) * expiry,
+        )
+        self._maybe_purge()
+        return count is not None
+
+    def get_sliding_window(self, key: str, expiry: int) -> tuple[int, float, int, float]:
+        now = time.time()
+        previous_window, current_window, previous_weight = self._windows(expiry, now)
+        with self.engine.connect() as connection:
+            counts = dict(
+                connection.execute(
+                    _GET_SLIDING_WINDOW,
+                    {"key": key, "previous_window": previous_window, "current_window": current_window},
+                ).all()
+            )
+        previous_count = counts.get(previous_window, 0)
+        previous_ttl = previous_weight * expiry if previous_count else 0.0
+        current_ttl = previous_weight * expiry + expiry
+        return previous_count, previous_ttl, counts.get(current_window, 0), current_ttl
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        count = self._scalar(_INCR_FIXED_WINDOW, key=key, amount=amount, expires_at=time.time() + expiry)
+        self._maybe_purge()
+        return int(count)
+
+    def get(self, key: str) -> int:
+        count = self._scalar(
+            text(
+                "SELECT count FROM rate_limit_windows "
+                "WHERE key = :key AND window_start = :window AND expires_at > now()"
+            ),
+            key=key,
+            window=_FIXED_WINDOW,
+        )
+        return int(count or 0)
+
+    def get_expiry(self, key: str) -> float:
+        expires_at = self._scalar(
+            text(
+                "SELECT extract(epoch FROM expires_at) FROM rate_limit_windows "
+                "WHERE key = :key AND window_start = :window"
+            ),
+            key=key,
+            window=_FIXED_WINDOW,
+        )
+        return float(expires_at) if expires_at is not None else time.time()
+
+    def check(self) -> bool:
+        try:
+            return self._scalar(text("SELECT 1")) == 1
+        except SQLAlchemyError:
+            return False
+
+    def reset(self) -> int | None:
+        with self.engine.begin() as connection:
+            return connection.execute(text("DELETE FROM rate_limit_windows")).rowcount
+
+    def clear(self, key: str) -> None:
+        with self.engine.begin() as connection:
+            connection.execute(text("DELETE FROM rate_limit_windows WHERE key = :key"), {"key": key})
+
+    def _maybe_purge(self) -> None:
+        # Expired windows are only dead weight; sweep them now and then instead of per hit.
+        self._hits += 1
+        if self._hits % _PURGE_EVERY_HITS == 0:
+            with self.engine.begin() as connection:
+                connection.execute(text("DELETE FROM rate_limit_windows WHERE expires_at < now()"))
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_SLOWEST_KEPT = 5
+_STATEMENT_PREVIEW_CHARS = 300
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def _shape(statement: str) -> str:
+    # Statements arrive with bound parameters already factored out, so whitespace is the only
+    # noise between two executions of the same query.
+    return " ".join(statement.split())[:_STATEMENT_PREVIEW_CHARS]
+
+
+@dataclass
+class QueryStats:
+    """Query counts and timings for one unit of work (a request or a pipeline run)."""
+
+    label: str
+    count: int = 0
+    total_ms: float = 0.0
+    stage: str | None = None
+    stages: dict[str, dict[str, Any]] = field(default_factory=dict)
+    shapes: Counter = field(default_factory=Counter)
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        shape = _shape(statement)
+        with self._lock:
+            self._record(shape, elapsed_ms)
+
+    def _record(self, shape: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += 1
+        if self.stage is not None:
+            totals = self.stages.setdefault(self.stage, {"queries": 0, "query_ms": 0.0})
+            totals["queries"] += 1
+            totals["query_ms"] += elapsed_ms
+        if len(self.slowest) < _SLOWEST_KEPT or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, shape))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[_SLOWEST_KEPT:]
+
+    def repeated(self) -> list[tuple[str, int]]:
+        """Statement shapes executed often enough in this unit to look like an N+1 loop."""
+        threshold = get_settings().sql_repeat_threshold
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def summary(self) -> dict[str, Any]:
+        result: dict[str, Any] = {
+            "queries": self.count,
+            "query_ms": round(self.total_ms),
+            "slowest": [{"ms": round(ms, 1), "statement": shape} for ms, shape in self.slowest],
+            "repeated": [{"statement": shape, "count": count} for shape, count in self.repeated()],
+        }
+        if self.stages:
+            result["stages"] = {
+                stage: {"queries": totals["queries"], "query_ms": round(totals["query_ms"])}
+                for stage, totals in self.stages.items()
+            }
+        return result
+
+
+def mark_query_stage(stage: str) -> None:
+    """Attribute subsequent queries of the current unit of work to ``stage``."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.stage = stage
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[QueryStats]:
+    """Collect every query issued from this context.
+
+    Worker threads only report here when their work is submitted through a copy of this context
+    (``contextvars.copy_context().run``); a bare ``ThreadPoolExecutor`` starts them untracked.
+
+    Nested calls keep the outer tracker: the first caller owns the unit of work, so a pipeline
+    run started from an instrumented request is still reported as a single total.
+    """
+    outer = _current_stats.get()
+    if outer is not None:
+        yield outer
+        return
+    stats = QueryStats(label=label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        for shape, count in stats.repeated():
+            logger.warning("Possible N+1 in %s: %d executions of %s", label, count, shape)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    if elapsed_ms >= get_settings().sql_slow_query_ms:
+        label = stats.label if stats is not None else "untracked"
+        logger.warning("Slow query in %s (%.0f ms): %s", label, elapsed_ms, _shape(statement))
+
+
+def _handle_error(exception_context) -> None:
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
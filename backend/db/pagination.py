@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator
+
+from sqlalchemy import Select, inspect
+from sqlalchemy.orm import InstrumentedAttribute, Session
+
+from core.config import get_settings
+
+
+def iter_keyset_chunks(
+    db: Session,
+    statement: Select,
+    key_column: InstrumentedAttribute,
+    key: Callable[[Any], Any] | None = None,
+    chunk_size: int | None = None,
+) -> Iterator[list[Any]]:
+    """Yield ``statement`` results in chunks ordered by ``key_column``.
+
+    Each chunk is fetched with ``WHERE key > :last LIMIT :chunk_size`` so memory stays flat no
+    matter how many rows match. After the caller finishes a chunk the session is committed and
+    the chunk's ORM objects are expunged, so they leave the identity map; anything else the
+    caller holds in the session stays attached.
+    """
+    size = chunk_size or get_settings().pipeline_chunk_size
+    key_of = key or (lambda row: row)
+    last_key = None
+    while True:
+        page = statement.order_by(key_column.asc()).limit(size)
+        if last_key is not None:
+            page = page.where(key_column > last_key)
+        rows = db.scalars(page).all()
+        if not rows:
+            return
+
+        last_key = key_of(rows[-1])
+        yield list(rows)
+
+        db.commit()
+        for row in rows:
+            if inspect(row, raiseerr=False) is not None and row in db:
+                db.expunge(row)
+        if len(rows) < size:
+            return
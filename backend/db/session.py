@@ -1,13 +1,173 @@
 from __future__ import annotations
 
-from sqlalchemy import create_engine
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from sqlalchemy import Engine, create_engine, event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from core.config import get_settings, normalize_database_url
+from db.instrumentation import instrument_engine
 
 settings = get_settings()
-engine = create_engine(normalize_database_url(settings.database_url), pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, expire_on_commit=False)
+
+# Engines are built on first use rather than at import: creating one loads the psycopg driver,
+# which is a noticeable share of a serverless cold start for routes that never touch the DB.
+_engines: dict[str, Any] = {}
+_engine_lock = threading.Lock()
+
+
+def _get_or_build(name: str, build: Callable[[], Any]) -> Any:
+    engine = _engines.get(name)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = _engines[name] = build()
+    return engine
+
+
+def _ping_after_idle(engine: Engine) -> None:
+    """Check liveness only for connections that sat idle in the pool.
+
+    ``pool_pre_ping`` costs a round trip on every checkout. Connections are recycled by age
+    instead, and only one that has been idle longer than ``db_ping_after_idle_seconds`` (long
+    enough for Neon or the pooler to have dropped it) is pinged before being handed out.
+    """
+    idle_limit = settings.db_ping_after_idle_seconds
+
+    @event.listens_for(engine, "checkin")
+    def _mark_idle(dbapi_connection, connection_record) -> None:
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_limit:
+            return
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            dbapi_connection.rollback()
+        except Exception as error:
+            # The pool discards this connection and retries the checkout with a fresh one.
+            raise exc.DisconnectionError() from error
+
+
+def _pool_options() -> dict[str, Any]:
+    return {"pool_recycle": settings.db_pool_recycle_seconds, "pool_timeout": settings.db_pool_timeout_seconds}
+
+
+def _request_engine_options() -> dict[str, Any]:
+    # Request traffic goes through the pooled (pgbouncer, transaction mode) URL. Server-side
+    # prepared statements don't survive transaction pooling, so psycopg must not create them.
+    return {
+        **_pool_options(),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "connect_args": {"prepare_threshold": None},
+    }
+
+
+def _build_engine() -> Engine:
+    engine = create_engine(normalize_database_url(settings.database_url), **_request_engine_options())
+    instrument_engine(engine)
+    _ping_after_idle(engine)
+    return engine
+
+
+def _build_async_engine() -> AsyncEngine:
+    # psycopg 3 speaks asyncio natively, so the same URL builds the async engine.
+    engine = create_async_engine(normalize_database_url(settings.database_url), **_request_engine_options())
+    instrument_engine(engine.sync_engine)
+    _ping_after_idle(engine.sync_engine)
+    return engine
+
+
+def _build_pipeline_engine() -> Engine:
+    # Pipeline jobs hold transactions for minutes; they get a small pool of direct connections so
+    # they never starve request traffic and can use session state and cursors safely.
+    engine = create_engine(
+        normalize_database_url(settings.database_url_unpooled),
+        pool_size=settings.pipeline_db_pool_size,
+        max_overflow=settings.pipeline_db_max_overflow,
+        **_pool_options(),
+    )
+    instrument_engine(engine)
+    _ping_after_idle(engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    return _get_or_build("request", _build_engine)
+
+
+def get_async_engine() -> AsyncEngine:
+    return _get_or_build("async", _build_async_engine)
+
+
+def get_pipeline_engine() -> Engine:
+    # Resolve the fallback before taking the build lock: it is not reentrant, and building the
+    # request engine from inside another build would wait on it forever.
+    if not settings.database_url_unpooled:
+        return get_engine()
+    return _get_or_build("pipeline", _build_pipeline_engine)
+
+
+class _LazySessionmaker(sessionmaker):
+    """``sessionmaker`` that binds its engine when the first session is created."""
+
+    def __init__(self, engine_factory: Callable[[], Engine], **kw: Any) -> None:
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine_factory())
+        return super().__call__(**local_kw)
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    def __init__(self, engine_factory: Callable[[], AsyncEngine], **kw: Any) -> None:
+        super().__init__(**kw)
+        self._engine_factory = engine_factory
+
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._engine_factory())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(get_engine, autocommit=False, autoflush=False, expire_on_commit=False)
+AsyncSessionLocal = _LazyAsyncSessionmaker(get_async_engine, autoflush=False, expire_on_commit=False)
+PipelineSessionLocal = _LazySessionmaker(get_pipeline_engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+async def warm_up_pools() -> None:
+    """Open a minimal request pool ahead of the first request so it skips connection setup.
+
+    Best effort: a cold or unreachable database only means the first request connects itself.
+    """
+
+    async def _open_async() -> None:
+        async with get_async_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    def _open_sync() -> None:
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    count = settings.db_warmup_connections
+    await asyncio.gather(
+        *(_open_async() for _ in range(count)),
+        *(asyncio.to_thread(_open_sync) for _ in range(count)),
+        return_exceptions=True,
+    )
 
 
 def get_db() -> Session:
@@ -16,3 +176,36 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def get_pipeline_db() -> Session:
+    db = PipelineSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+@contextmanager
+def savepoint(db: Session) -> Iterator[None]:
+    """Run one unit of work inside a SAVEPOINT so a failure only rolls back that unit.
+
+    Units that commit on their own are fine: the commit releases the savepoint and there is
+    nothing left to roll back. The original exception is re-raised for the caller to record.
+    """
+    nested = db.begin_nested()
+    try:
+        yield
+    except Exception:
+        if nested.is_active:
+            nested.rollback()
+        else:
+            db.rollback()
+        raise
+    if nested.is_active:
+        nested.commit()
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import _rate_limit_exceeded_handler
@@ -7,11 +10,22 @@ from slowapi.errors import RateLimitExceeded
 
 from core.config import get_settings
 from core.rate_limit import limiter
+from db.instrumentation import track_queries
+from db.session import warm_up_pools
 from routes import email_reply_router, health_router, meta_router, oauth_router, pipeline_router, public_router
 
 settings = get_settings()
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_warmup_on_startup:
+        # Not awaited: startup must not wait on the database.
+        app.state.pool_warmup = asyncio.create_task(warm_up_pools())
+    yield
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
@@ -34,6 +48,20 @@ async def security_headers(request: Request, call_next):
     return response
 
 
+if settings.environment == "development":
+
+    @app.middleware("http")
+    async def query_stats_headers(request: Request, call_next):
+        with track_queries(f"{request.method} {request.url.path}") as stats:
+            response = await call_next(request)
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Query-Time-Ms"] = f"{stats.total_ms:.1f}"
+        repeated = stats.repeated()
+        if repeated:
+            response.headers["X-DB-Repeated-Queries"] = str(sum(count for _shape, count in repeated))
+        return response
+
+
 app.include_router(health_router)
 app.include_router(public_router)
 app.include_router(oauth_router)
@@ -1,23 +1,35 @@
+from models.city import City
 from models.city_venue import CityVenue
+from models.event import Event
+from models.geocoded_address import GeocodedAddress
 from models.hobby_city_pair import HobbyCityPair
 from models.hobby_tag import HobbyTag
+from models.job import Job
 from models.newsletter import Newsletter
 from models.newsletter_feedback import NewsletterFeedback
 from models.oauth_token import OAuthToken
 from models.onboarding_step import OnboardingStep
+from models.pipeline_run import PipelineRun
+from models.rate_limit_window import RateLimitWindow
 from models.user import User
 from models.user_goal import UserGoal
 from models.user_hobby import UserHobby
 from models.waitlist_entry import WaitlistEntry
 
 __all__ = [
+    "City",
     "CityVenue",
+    "Event",
+    "GeocodedAddress",
     "HobbyCityPair",
     "HobbyTag",
+    "Job",
     "Newsletter",
     "NewsletterFeedback",
     "OAuthToken",
     "OnboardingStep",
+    "PipelineRun",
+    "RateLimitWindow",
     "User",
     "UserGoal",
     "UserHobby",
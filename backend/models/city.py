@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import Boolean, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base_class import Base
+
+
+class City(Base):
+    __tablename__ = "cities"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    slug: Mapped[str] = mapped_column(String(120), nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
+    region: Mapped[str | None] = mapped_column(String(120), nullable=True)
+    timezone: Mapped[str] = mapped_column(String(60), nullable=False, default="America/Chicago")
+    aliases: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    is_pilot: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default="false")
+    venues_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    venue_refresh_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_venue_discovery_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import DateTime, String, Text, UniqueConstraint, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -11,7 +11,10 @@ from db.base_class import Base
 
 class CityVenue(Base):
     __tablename__ = "city_venues"
-    __table_args__ = (UniqueConstraint("city", "venue_name", name="uq_city_venues_city_name"),)
+    __table_args__ = (
+        UniqueConstraint("city", "venue_name", name="uq_city_venues_city_name"),
+        Index("ix_city_venues_city_type_name", "city", "venue_type", "venue_name"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     city: Mapped[str] = mapped_column(String(120), nullable=False, index=True)
@@ -19,7 +22,14 @@ class CityVenue(Base):
     venue_type: Mapped[str] = mapped_column(String(50), nullable=False, default="music")
     address: Mapped[str | None] = mapped_column(Text, nullable=True)
     website: Mapped[str | None] = mapped_column(Text, nullable=True)
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
     last_searched: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     last_events_searched: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     cached_events: Mapped[list[dict]] = mapped_column(JSONB, nullable=False, default=list)
+    results_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    events_changed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    # Adaptive schedule for the venue's event search; discovery is scheduled per city.
+    refresh_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_refresh_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from sqlalchemy import DateTime, Float, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base_class import Base
+
+
+class GeocodedAddress(Base):
+    """Cached geocoding result for a normalized address (see ``services.geocoding``).
+
+    Misses from a real provider are cached too, with null coordinates, and only honored for the
+    provider that recorded them until ``geocoding_miss_ttl_seconds`` pass. ``created_at`` is when
+    the row was last resolved.
+    """
+
+    __tablename__ = "geocoded_addresses"
+
+    city: Mapped[str] = mapped_column(String(120), primary_key=True)
+    query: Mapped[str] = mapped_column(String(300), primary_key=True)
+    lat: Mapped[float | None] = mapped_column(Float, nullable=True)
+    lng: Mapped[float | None] = mapped_column(Float, nullable=True)
+    provider: Mapped[str] = mapped_column(String(40), nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -20,5 +20,12 @@ class HobbyCityPair(Base):
     frequency: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
     last_searched: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     cached_results: Mapped[list[dict]] = mapped_column(JSONB, nullable=False, default=list)
+    results_fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    events_changed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    refresh_interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_refresh_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     hobby_tag = relationship("HobbyTag", back_populates="hobby_city_pairs")
+
+
+Index("ix_hobby_city_pairs_city_frequency", HobbyCityPair.city, HobbyCityPair.frequency.desc())
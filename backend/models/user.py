@@ -29,6 +29,10 @@ class User(Base):
     updated_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
     )
+    hobbies_changed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    context_changed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    hobbies_parsed_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    newsletter_drafted_at: Mapped[DateTime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     hobbies = relationship("UserHobby", back_populates="user", cascade="all, delete-orphan")
     goals = relationship("UserGoal", back_populates="user", cascade="all, delete-orphan")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Select, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from models import CityVenue, HobbyCityPair, User
+from services.cities import get_city_registry
+
+
+def count_rows(db: Session, query: Select) -> int:
+    return db.scalar(select(func.count()).select_from(query.subquery())) or 0
+
+
+def hobbies_need_parse() -> ColumnElement[bool]:
+    return or_(User.hobbies_parsed_at.is_(None), User.hobbies_changed_at > User.hobbies_parsed_at)
+
+
+def _city_event_changes(db: Session) -> dict[str, datetime]:
+    """Map each stored ``User.city`` value to the last time its event bundle changed.
+
+    Pairs and venues are keyed by the canonical registry city; each distinct raw user city is
+    resolved to that key here so the draft filter can stay a ``CASE`` on ``User.city``.
+    """
+    pair_changes = dict(
+        db.execute(
+            select(HobbyCityPair.city, func.max(HobbyCityPair.events_changed_at))
+            .where(HobbyCityPair.events_changed_at.is_not(None))
+            .group_by(HobbyCityPair.city)
+        ).all()
+    )
+    venue_changes = dict(
+        db.execute(
+            select(CityVenue.city, func.max(CityVenue.events_changed_at))
+            .where(CityVenue.events_changed_at.is_not(None))
+            .group_by(CityVenue.city)
+        ).all()
+    )
+
+    registry = get_city_registry(db)
+    changes: dict[str, datetime] = {}
+    for raw_city in db.scalars(select(User.city).distinct()):
+        key = registry.canonical(raw_city)
+        candidates = [
+            changed_at for changed_at in (pair_changes.get(key), venue_changes.get(key)) if changed_at is not None
+        ]
+        if candidates:
+            changes[raw_city] = max(candidates)
+    return changes
+
+
+def newsletter_needs_draft(db: Session) -> ColumnElement[bool]:
+    clauses: list[ColumnElement[bool]] = [
+        User.newsletter_drafted_at.is_(None),
+        User.hobbies_parsed_at > User.newsletter_drafted_at,
+        User.context_changed_at > User.newsletter_drafted_at,
+    ]
+    city_changes = _city_event_changes(db)
+    if city_changes:
+        clauses.append(User.newsletter_drafted_at < case(city_changes, value=User.city))
+    return or_(*clauses)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from db.session import SessionLocal
+from models import PipelineRun
+
+# Arbitrary constant shared by every process that hands out pipeline leases.
+LEASE_LOCK_KEY = 727_001
+ACTIVE_STATUSES = ("running", "dispatched")
+GLOBAL_SCOPE = "all"
+
+
+class RunInProgress(Exception):
+    def __init__(self, run: PipelineRun) -> None:
+        super().__init__(f"Pipeline run {run.id} is still active")
+        self.details: dict[str, Any] = {
+            "detail": "A pipeline run is already in progress",
+            "run_id": str(run.id),
+            "kind": run.kind,
+            "scope": run.scope,
+            "run_group": run.run_group,
+            "status": run.status,
+            "stage": run.stage,
+            "progress": run.progress,
+            "started_at": run.started_at.isoformat(),
+            "heartbeat_at": run.heartbeat_at.isoformat(),
+            "expires_at": run.expires_at.isoformat(),
+        }
+
+
+class LeaseLost(Exception):
+    """The run's lease expired or was taken over; its work must stop without touching the row."""
+
+    def __init__(self, run_id: UUID) -> None:
+        super().__init__(f"Pipeline run {run_id} no longer holds its lease")
+        self.run_id = run_id
+
+
+class RunLease:
+    """Handle on an acquired ``pipeline_runs`` row.
+
+    The lease uses its own session so heartbeats never commit or roll back the pipeline's
+    in-flight work. A lease that stops heartbeating expires after the configured TTL and the
+    next caller may take over; a heartbeat after that raises ``LeaseLost`` so two runs never
+    work at once.
+    """
+
+    def __init__(self, run_id: UUID, ttl: timedelta) -> None:
+        self.run_id = run_id
+        self.ttl = ttl
+        self.progress: dict[str, Any] = {}
+
+    def _update(self, *conditions: Any, **values: Any) -> int:
+        with SessionLocal() as db:
+            result = db.execute(update(PipelineRun).where(PipelineRun.id == self.run_id, *conditions).values(**values))
+            db.commit()
+        return result.rowcount
+
+    def heartbeat(self, stage: str, progress: dict[str, Any] | None = None) -> None:
+        """Extend the lease, or raise ``LeaseLost`` if it already lapsed (and may have a new owner)."""
+        if progress:
+            self.progress.update(progress)
+        now = datetime.now(tz=timezone.utc)
+        extended = self._update(
+            PipelineRun.status == "running",
+            PipelineRun.expires_at > func.now(),
+            stage=stage,
+            progress=dict(self.progress),
+            heartbeat_at=now,
+            expires_at=now + self.ttl,
+        )
+        if not extended:
+            raise LeaseLost(self.run_id)
+
+    def dispatch(self, progress: dict[str, Any] | None = None) -> None:
+        """Hand the lease to fire-and-forget work: it stays held until the TTL runs out."""
+        if progress:
+            self.progress.update(progress)
+        now = datetime.now(tz=timezone.utc)
+        self._update(status="dispatched", progress=dict(self.progress), heartbeat_at=now, expires_at=now + self.ttl)
+
+    def finish(self, status: str = "completed", progress: dict[str, Any] | None = None) -> None:
+        if progress:
+            self.progress.update(progress)
+        now = datetime.now(tz=timezone.utc)
+        self._update(status=status, progress=dict(self.progress), heartbeat_at=now, finished_at=now, expires_at=now)
+
+
+def acquire_run_lease(kind: str, scope: str = GLOBAL_SCOPE, run_group: str | None = None) -> RunLease:
+    """Claim the pipeline run lease or raise ``RunInProgress`` with the active run.
+
+    ``scope`` is either ``"all"`` or a single city shard. A global run conflicts with every
+    active run; a city shard only conflicts with a global run or another run of the same city.
+
+    The check-and-insert runs under a transaction-scoped advisory lock, so two callers can
+    never both see "no active run"; the lock is released on commit, which also keeps this
+    safe behind a transaction-mode connection pooler.
+    """
+    ttl = timedelta(seconds=get_settings().pipeline_lease_ttl_seconds)
+    now = datetime.now(tz=timezone.utc)
+    with SessionLocal() as db:
+        db.execute(select(func.pg_advisory_xact_lock(LEASE_LOCK_KEY)))
+        _expire_stale_runs(db, now)
+        query = select(PipelineRun).where(PipelineRun.status.in_(ACTIVE_STATUSES), PipelineRun.expires_at > now)
+        if scope != GLOBAL_SCOPE:
+            query = query.where(PipelineRun.scope.in_((GLOBAL_SCOPE, scope)))
+        active = db.scalars(query.order_by(PipelineRun.started_at.desc())).first()
+        if active:
+            raise RunInProgress(active)
+
+        run = PipelineRun(
+            kind=kind,
+            scope=scope,
+            run_group=run_group,
+            status="running",
+            progress={},
+            expires_at=now + ttl,
+        )
+        db.add(run)
+        db.commit()
+        return RunLease(run.id, ttl)
+
+
+def _expire_stale_runs(db: Session, now: datetime) -> None:
+    db.execute(
+        update(PipelineRun)
+        .where(PipelineRun.status.in_(ACTIVE_STATUSES), PipelineRun.expires_at <= now)
+        .values(status="expired", finished_at=now)
+    )
+
+
+@contextmanager
+def run_lease(kind: str, scope: str = GLOBAL_SCOPE, run_group: str | None = None) -> Iterator[RunLease]:
+    lease = acquire_run_lease(kind, scope=scope, run_group=run_group)
+    try:
+        yield lease
+    except LeaseLost:
+        # The row belongs to whoever expired it now; leave it alone.
+        raise
+    except Exception:
+        lease.finish(status="failed")
+        raise
+    lease.finish()
@@ -1,25 +1,41 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import and_, select
 from sqlalchemy.orm import Session
 
-from models import User
+from db.instrumentation import mark_query_stage, track_queries
+from db.pagination import iter_keyset_chunks
+from db.session import savepoint
+from models import HobbyCityPair, Newsletter, User
+from pipeline.incremental import count_rows, hobbies_need_parse, newsletter_needs_draft
+from pipeline.lease import LeaseLost, RunLease
+from pipeline.sharding import resolve_city_shard
 from services.email import draft_newsletters, send_newsletters
-from services.events import search_events_for_pairs
+from services.events import pair_needs_search, search_events_for_pairs, search_events_for_user
 from services.hobbies import parse_and_store_user_hobbies
-from services.venues import discover_pilot_city_venues, search_venue_events
+from services.venues import discover_major_music_venues, discover_pilot_city_venues, search_venue_events
 
 
 def run_user_pipeline(db: Session, user_id: UUID) -> dict:
     """Run pipeline for a single user. Should complete in <10s."""
+    with track_queries("run_user_pipeline") as stats:
+        result = _run_user_pipeline(db, user_id)
+    result["sql"] = stats.summary()
+    return result
+
+
+def _run_user_pipeline(db: Session, user_id: UUID) -> dict:
     errors = []
     parsed_count = 0
+    pair_summary: dict = {}
     drafted = 0
     sent = 0
     
     # Parse user hobbies
+    mark_query_stage("parse_hobbies")
     try:
         tags = parse_and_store_user_hobbies(db, user_id)
         if tags:
@@ -27,13 +43,22 @@ def run_user_pipeline(db: Session, user_id: UUID) -> dict:
     except Exception as e:
         errors.append(f"parse_hobbies: {str(e)}")
     
+    # Serve cached pair results; stale pairs are refreshed by a background job, not here
+    mark_query_stage("search_pairs")
+    try:
+        pair_summary = search_events_for_user(db, user_id)
+    except Exception as e:
+        errors.append(f"search_pairs: {str(e)}")
+    
     # Draft newsletter
+    mark_query_stage("draft_newsletters")
     try:
-        drafted = draft_newsletters(db, user_id)
+        drafted = draft_newsletters(db, user_id, errors=errors)
     except Exception as e:
         errors.append(f"draft_newsletters: {str(e)}")
     
     # Send newsletter
+    mark_query_stage("send_newsletters")
     try:
         sent = send_newsletters(db, user_id)
     except Exception as e:
@@ -42,6 +67,7 @@ def run_user_pipeline(db: Session, user_id: UUID) -> dict:
     result = {
         "user_id": str(user_id),
         "parsed_hobbies": parsed_count,
+        "queued_pair_refreshes": pair_summary.get("queued", 0),
         "drafted_newsletters": drafted,
         "sent_newsletters": sent,
     }
@@ -52,65 +78,155 @@ def run_user_pipeline(db: Session, user_id: UUID) -> dict:
     return result
 
 
-def run_weekly_pipeline(db: Session) -> dict:
+def _heartbeat(lease: RunLease | None, stage: str, **progress: int) -> None:
+    mark_query_stage(stage)
+    if lease is not None:
+        lease.heartbeat(stage, progress)
+
+
+def run_weekly_pipeline(
+    db: Session,
+    incremental: bool = False,
+    lease: RunLease | None = None,
+    city: str | None = None,
+) -> dict:
+    """Run every pipeline stage.
+
+    ``incremental`` limits work to users and pairs that changed; ``city`` restricts every stage
+    to one city shard so shards can run in parallel workers. Query counts and timings per stage
+    are reported under ``sql``.
+    """
+    with track_queries("run_weekly_pipeline") as stats:
+        result = _run_weekly_pipeline(db, incremental=incremental, lease=lease, city=city)
+    result["sql"] = stats.summary()
+    return result
+
+
+def _run_weekly_pipeline(db: Session, incremental: bool, lease: RunLease | None, city: str | None) -> dict:
     errors = []
+    skipped = {"parse_hobbies": 0, "search_pairs": 0, "draft_newsletters": 0}
+    shard = resolve_city_shard(db, city) if city else None
+    users_query = select(User.id)
+    if shard:
+        users_query = users_query.where(shard.user_clause())
     
     # Parse user hobbies
-    users = []
+    _heartbeat(lease, "parse_hobbies")
+    users_seen = 0
     parsed_count = 0
+    failed_parses = 0
     try:
-        users = db.scalars(select(User)).all()
-        for user in users:
-            tags = parse_and_store_user_hobbies(db, user.id)
-            if tags:
-                parsed_count += 1
+        parse_query = users_query
+        if incremental:
+            parse_query = parse_query.where(hobbies_need_parse())
+            skipped["parse_hobbies"] = count_rows(db, users_query) - count_rows(db, parse_query)
+        for user_ids in iter_keyset_chunks(db, parse_query, User.id):
+            users_seen += len(user_ids)
+            for user_id in user_ids:
+                try:
+                    with savepoint(db):
+                        tags = parse_and_store_user_hobbies(db, user_id)
+                except Exception as e:
+                    failed_parses += 1
+                    errors.append(f"parse_hobbies[{user_id}]: {str(e)}")
+                    continue
+                if tags:
+                    parsed_count += 1
+            _heartbeat(lease, "parse_hobbies", users_seen=users_seen, parsed_hobbies=parsed_count)
+    except LeaseLost:
+        raise
     except Exception as e:
         errors.append(f"parse_hobbies: {str(e)}")
 
     # Search event pairs
+    _heartbeat(lease, "search_pairs")
     pairs_processed = 0
+    pair_cities = shard.pair_cities if shard else None
     try:
-        pairs_processed = search_events_for_pairs(db)
+        if incremental:
+            fresh_pairs = select(HobbyCityPair.id).where(~pair_needs_search(datetime.now(tz=timezone.utc)))
+            if pair_cities is not None:
+                fresh_pairs = fresh_pairs.where(HobbyCityPair.city.in_(pair_cities))
+            skipped["search_pairs"] = count_rows(db, fresh_pairs)
+        pairs_processed = search_events_for_pairs(
+            db,
+            stale_only=incremental,
+            cities=pair_cities,
+            on_progress=lambda searched: _heartbeat(lease, "search_pairs", searched_pairs=searched),
+        )
+    except LeaseLost:
+        raise
     except Exception as e:
         errors.append(f"search_pairs: {str(e)}")
 
     # Discover venues
+    _heartbeat(lease, "discover_venues", searched_pairs=pairs_processed)
     discovered_venues = 0
     try:
-        discovered_venues = discover_pilot_city_venues(db)
+        if shard:
+            discovered_venues = discover_major_music_venues(db, city=shard.city)
+        else:
+            discovered_venues = discover_pilot_city_venues(db)
     except Exception as e:
         errors.append(f"discover_venues: {str(e)}")
 
     # Search venue events
+    _heartbeat(lease, "search_venue_events", discovered_venues=discovered_venues)
     searched_venue_events = 0
     try:
-        searched_venue_events = search_venue_events(db)
+        searched_venue_events = search_venue_events(db, city=shard.city if shard else None)
     except Exception as e:
         errors.append(f"search_venue_events: {str(e)}")
 
     # Draft newsletters
+    _heartbeat(lease, "draft_newsletters", searched_venue_events=searched_venue_events)
     drafted = 0
+    draft_errors: list[str] = []
     try:
-        drafted = draft_newsletters(db)
+        conditions = [shard.user_clause()] if shard else []
+        if incremental:
+            subscribed = users_query.where(User.is_subscribed.is_(True))
+            needs_draft = newsletter_needs_draft(db)
+            conditions.append(needs_draft)
+            skipped["draft_newsletters"] = count_rows(db, subscribed) - count_rows(db, subscribed.where(needs_draft))
+        drafted = draft_newsletters(
+            db,
+            errors=draft_errors,
+            condition=and_(*conditions) if conditions else None,
+            on_progress=lambda count: _heartbeat(lease, "draft_newsletters", drafted_newsletters=count),
+        )
+    except LeaseLost:
+        raise
     except Exception as e:
         errors.append(f"draft_newsletters: {str(e)}")
+    errors.extend(draft_errors)
 
     # Send newsletters
+    _heartbeat(lease, "send_newsletters", drafted_newsletters=drafted)
     sent = 0
     try:
-        sent = send_newsletters(db)
+        send_condition = Newsletter.user_id.in_(users_query) if shard else None
+        sent = send_newsletters(db, condition=send_condition)
     except Exception as e:
         errors.append(f"send_newsletters: {str(e)}")
 
     result = {
-        "users_seen": len(users),
+        "users_seen": users_seen,
         "parsed_hobbies": parsed_count,
         "searched_pairs": pairs_processed,
         "discovered_venues": discovered_venues,
         "searched_venue_events": searched_venue_events,
         "drafted_newsletters": drafted,
         "sent_newsletters": sent,
+        "failed_users": {
+            "parse_hobbies": failed_parses,
+            "draft_newsletters": len(draft_errors),
+        },
     }
+    if shard:
+        result["city"] = shard.city
+    if incremental:
+        result["skipped"] = skipped
     
     if errors:
         result["errors"] = errors
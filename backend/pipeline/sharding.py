@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import ColumnElement, func, select
+from sqlalchemy.orm import Session
+
+from models import PipelineRun, User
+from services.cities import get_city_registry
+
+
+@dataclass
+class CityShard:
+    """One city's slice of the weekly pipeline.
+
+    ``city`` is the canonical registry key that pairs, venues and events are stored under;
+    ``user_cities`` holds the raw ``User.city`` spellings that resolve to it, so the user filter
+    stays a plain indexed equality check.
+    """
+
+    city: str
+    user_cities: list[str] = field(default_factory=list)
+    user_count: int = 0
+
+    @property
+    def pair_cities(self) -> list[str]:
+        return [self.city]
+
+    def user_clause(self) -> ColumnElement[bool]:
+        return User.city.in_(self.user_cities)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"city": self.city, "users": self.user_count}
+
+
+def plan_city_shards(db: Session) -> list[CityShard]:
+    registry = get_city_registry(db)
+    shards = {city: CityShard(city=city) for city in registry.pilot_slugs()}
+    for raw_city, count in db.execute(select(User.city, func.count()).group_by(User.city)).all():
+        key = registry.canonical(raw_city)
+        shard = shards.setdefault(key, CityShard(city=key))
+        shard.user_cities.append(raw_city)
+        shard.user_count += count
+    return sorted(shards.values(), key=lambda shard: shard.user_count, reverse=True)
+
+
+def resolve_city_shard(db: Session, city: str) -> CityShard:
+    key = get_city_registry(db).canonical(city)
+    for shard in plan_city_shards(db):
+        if shard.city == key:
+            return shard
+    return CityShard(city=key)
+
+
+def _merge_totals(totals: dict[str, Any], progress: dict[str, Any]) -> None:
+    for key, value in progress.items():
+        if isinstance(value, bool) or key == "city":
+            continue
+        if isinstance(value, int):
+            totals[key] = totals.get(key, 0) + value
+        elif isinstance(value, list):
+            totals.setdefault(key, []).extend(value)
+        elif isinstance(value, dict):
+            _merge_totals(totals.setdefault(key, {}), value)
+
+
+def summarize_run_group(db: Session, run_group: str) -> dict[str, Any]:
+    """Aggregate per-shard results of one sharded run into run-wide totals."""
+    runs = db.scalars(
+        select(PipelineRun).where(PipelineRun.run_group == run_group).order_by(PipelineRun.started_at.asc())
+    ).all()
+    totals: dict[str, Any] = {}
+    for run in runs:
+        _merge_totals(totals, run.progress or {})
+    return {
+        "run_group": run_group,
+        "shards": [
+            {"city": run.scope, "status": run.status, "stage": run.stage, "run_id": str(run.id)} for run in runs
+        ],
+        "totals": totals,
+    }
@@ -3,10 +3,10 @@ from __future__ import annotations
 from typing import Any
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import get_settings
-from db.session import get_db
+from db.session import get_async_db
 from services.reply_agent import process_inbound_reply_payload
 
 router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
@@ -26,7 +26,7 @@ async def handle_email_reply_webhook(
     request: Request,
     x_resend_signature: str | None = Header(default=None),
     x_webhook_secret: str | None = Header(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict[str, Any]:
     # Resend can send signatures; we allow either explicit webhook secret or signature passthrough
     # for lightweight verification in this service.
@@ -37,7 +37,7 @@ async def handle_email_reply_webhook(
     except Exception as exc:
         raise HTTPException(status_code=400, detail="Invalid webhook payload") from exc
 
-    result = process_inbound_reply_payload(db, payload if isinstance(payload, dict) else {})
+    result = await process_inbound_reply_payload(db, payload if isinstance(payload, dict) else {})
 
     from_email = get_settings().resend_from_email.lower()
     if "resend.dev" in from_email:
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import time
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.session import get_async_db
 
 router = APIRouter(tags=["health"])
 
@@ -8,3 +14,10 @@ router = APIRouter(tags=["health"])
 @router.get("/healthz")
 def healthcheck() -> dict:
     return {"status": "ok"}
+
+
+@router.get("/healthz/db")
+async def database_healthcheck(db: AsyncSession = Depends(get_async_db)) -> dict:
+    started = time.perf_counter()
+    await db.execute(text("SELECT 1"))
+    return {"status": "ok", "db_ms": round((time.perf_counter() - started) * 1000, 1)}
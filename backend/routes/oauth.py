@@ -5,7 +5,6 @@ from datetime import datetime, timedelta, timezone
 from urllib.parse import urlencode
 from uuid import UUID
 
-import httpx
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import RedirectResponse
 from sqlalchemy import select
@@ -14,7 +13,8 @@ from sqlalchemy.orm import Session
 from core.config import get_settings
 from db.session import get_db
 from models import OAuthToken, User
-from services.token_crypto import cipher
+from services.change_tracking import mark_user_changed
+from services.token_crypto import get_cipher
 from utils.security import make_signed_value, verify_signed_value
 
 router = APIRouter(prefix="/api/auth", tags=["oauth"])
@@ -29,8 +29,8 @@ def _update_provider_token(
     refresh_token: str | None,
     expires_in: int | None,
 ) -> None:
-    encrypted_access = cipher.encrypt(access_token)
-    encrypted_refresh = cipher.encrypt(refresh_token) if refresh_token else None
+    encrypted_access = get_cipher().encrypt(access_token)
+    encrypted_refresh = get_cipher().encrypt(refresh_token) if refresh_token else None
     expires_at = datetime.now(tz=timezone.utc) + timedelta(seconds=expires_in) if expires_in else None
 
     existing = db.scalar(select(OAuthToken).where(OAuthToken.user_id == user_id, OAuthToken.provider == provider))
@@ -48,6 +48,7 @@ def _update_provider_token(
                 expires_at=expires_at,
             )
         )
+    mark_user_changed(db, user_id, context=True)
     db.commit()
 
 
@@ -102,6 +103,8 @@ def auth_google_callback(
         raise HTTPException(status_code=400, detail="Invalid OAuth state payload") from exc
 
     callback_url = f"{settings.backend_api_url.rstrip('/')}/api/auth/google/callback"
+    import httpx
+
     with httpx.Client(timeout=20) as client:
         token_response = client.post(
             "https://oauth2.googleapis.com/token",
@@ -174,6 +177,8 @@ def auth_spotify_callback(
         raise HTTPException(status_code=400, detail="Invalid OAuth state payload") from exc
 
     callback_url = f"{settings.backend_api_url.rstrip('/')}/api/auth/spotify/callback"
+    import httpx
+
     with httpx.Client(timeout=20) as client:
         token_response = client.post(
             "https://accounts.spotify.com/api/token",
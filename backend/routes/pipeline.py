@@ -1,17 +1,20 @@
 from __future__ import annotations
 
 import asyncio
-from uuid import UUID
+from uuid import UUID, uuid4
 
-import httpx
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.config import get_settings
-from db.session import get_db
+from db.pagination import iter_keyset_chunks
+from db.session import get_async_db, get_db, get_pipeline_db
 from models import User
+from pipeline.lease import GLOBAL_SCOPE, LeaseLost, RunInProgress, acquire_run_lease, run_lease
 from pipeline.runner import run_user_pipeline, run_weekly_pipeline
+from pipeline.sharding import plan_city_shards, summarize_run_group
 from schemas.pipeline import (
     DiscoverVenuesRequest,
     DraftEmailsRequest,
@@ -21,13 +24,26 @@ from schemas.pipeline import (
     SearchVenueEventsRequest,
     SendEmailsRequest,
 )
+from services.cities import normalize_city
 from services.email import draft_newsletters, send_newsletters
 from services.events import search_events_for_pairs
+from services.geocoding import backfill_coordinates
 from services.hobbies import parse_and_store_user_hobbies
+from services.jobs import run_pending_jobs
+from services.refresh_planner import plan_refresh
 from services.venues import discover_major_music_venues, discover_pilot_city_venues, search_venue_events
 
 router = APIRouter(prefix="/api/pipeline", tags=["pipeline"])
 
+# The event loop only keeps weak references to tasks; fire-and-forget fan-outs live here until done.
+_background_tasks: set[asyncio.Future] = set()
+
+
+def _fire_and_forget(coroutines: list) -> None:
+    task = asyncio.ensure_future(asyncio.gather(*coroutines, return_exceptions=True))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
 
 def _check_internal_auth(header_value: str | None, query_value: str | None = None) -> None:
     expected = get_settings().api_cron_secret
@@ -38,12 +54,101 @@ def _check_internal_auth(header_value: str | None, query_value: str | None = Non
 
 @router.post("/run")
 def run_pipeline(
+    incremental: bool = Query(default=False),
+    city: str | None = Query(default=None),
+    run_group: str | None = Query(default=None, max_length=64),
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: Session = Depends(get_pipeline_db),
+) -> dict:
+    _check_internal_auth(x_cron_secret, secret)
+    scope = normalize_city(city) if city else GLOBAL_SCOPE
+    try:
+        with run_lease("weekly", scope=scope, run_group=run_group) as lease:
+            result = run_weekly_pipeline(db, incremental=incremental, lease=lease, city=city)
+            lease.progress.update(result)
+    except RunInProgress as exc:
+        raise HTTPException(status_code=409, detail=exc.details) from exc
+    except LeaseLost as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    if run_group:
+        result["run_group"] = run_group
+    return result
+
+
+@router.get("/shards")
+def plan_shards(
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+) -> dict:
+    _check_internal_auth(x_cron_secret, secret)
+    return {"shards": [shard.as_dict() for shard in plan_city_shards(db)]}
+
+
+@router.get("/refresh-plan")
+def get_refresh_plan(
+    budget: int = Query(default=50, ge=1, le=1000),
+    city: str | None = Query(default=None),
+    incremental: bool = Query(default=False),
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: Session = Depends(get_db),
+) -> dict:
+    """Dry run: the pair and venue searches a run would make within ``budget`` LLM calls, best first."""
+    _check_internal_auth(x_cron_secret, secret)
+    cities = [normalize_city(city)] if city else None
+    return plan_refresh(db, budget=budget, cities=cities, due_only=incremental).as_dict()
+
+
+@router.post("/run-shards")
+async def run_pipeline_shards(
+    request: Request,
+    incremental: bool = Query(default=False),
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> dict:
+    """Fan the weekly pipeline out to one /run call per city shard. Fire-and-forget pattern."""
+    _check_internal_auth(x_cron_secret, secret)
+    shards = await db.run_sync(plan_city_shards)
+    run_group = uuid4().hex
+    base_url = str(request.base_url).rstrip("/")
+    secret_param = x_cron_secret or secret
+
+    import httpx
+
+    async def trigger_shard(city: str):
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                params = {"city": city, "run_group": run_group, "incremental": str(incremental).lower()}
+                headers = {"X-Cron-Secret": secret_param} if secret_param else {}
+                await client.post(f"{base_url}/api/pipeline/run", params=params, headers=headers)
+        except Exception:
+            # Shard progress and failures are tracked on its pipeline_runs row
+            pass
+
+    _fire_and_forget([trigger_shard(shard.city) for shard in shards])
+
+    return {
+        "detail": "Pipeline triggered for all city shards",
+        "run_group": run_group,
+        "shards": [shard.as_dict() for shard in shards],
+    }
+
+
+@router.get("/runs/{run_group}")
+def get_run_group(
+    run_group: str,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
     db: Session = Depends(get_db),
 ) -> dict:
     _check_internal_auth(x_cron_secret, secret)
-    return run_weekly_pipeline(db)
+    summary = summarize_run_group(db, run_group)
+    if not summary["shards"]:
+        raise HTTPException(status_code=404, detail="Run group not found")
+    return summary
 
 
 @router.post("/run-user/{user_id}")
@@ -51,7 +156,7 @@ def run_pipeline_for_user(
     user_id: UUID,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> dict:
     """Run pipeline for a single user. Completes in <10s."""
     _check_internal_auth(x_cron_secret, secret)
@@ -69,20 +174,31 @@ async def run_pipeline_all_users(
     request: Request,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     """Trigger per-user pipeline runs asynchronously. Fire-and-forget pattern."""
     _check_internal_auth(x_cron_secret, secret)
+    try:
+        lease = await asyncio.to_thread(acquire_run_lease, "run-all")
+    except RunInProgress as exc:
+        raise HTTPException(status_code=409, detail=exc.details) from exc
     
-    # Get all users
-    users = db.scalars(select(User)).all()
-    user_ids = [user.id for user in users]
+    # Collect user ids in keyset chunks so we never materialize full user rows
+    try:
+        user_ids: list[UUID] = await db.run_sync(
+            lambda session: [user_id for chunk in iter_keyset_chunks(session, select(User.id), User.id) for user_id in chunk]
+        )
+    except Exception:
+        await asyncio.to_thread(lease.finish, status="failed")
+        raise
     
     # Build the base URL for webhooks
     base_url = str(request.base_url).rstrip("/")
     secret_param = x_cron_secret or secret
     
     # Fire off async requests (fire-and-forget)
+    import httpx
+
     async def trigger_user_pipeline(user_id: UUID):
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
@@ -95,9 +211,9 @@ async def run_pipeline_all_users(
             pass
     
     # Trigger all user pipelines in the background
-    tasks = [trigger_user_pipeline(user_id) for user_id in user_ids]
-    # Don't await - let them run in background
-    asyncio.create_task(asyncio.gather(*tasks, return_exceptions=True))
+    _fire_and_forget([trigger_user_pipeline(user_id) for user_id in user_ids])
+    # Per-user runs keep going after we return, so hold the lease until its TTL lapses.
+    await asyncio.to_thread(lease.dispatch, {"users_triggered": len(user_ids)})
     
     return {
         "detail": "Pipeline triggered for all users",
@@ -111,7 +227,7 @@ def parse_hobbies(
     payload: ParseHobbiesRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
     tags = parse_and_store_user_hobbies(db, payload.user_id)
@@ -123,7 +239,7 @@ def search_events(
     payload: SearchEventsRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
     processed = search_events_for_pairs(db, city=payload.city, limit=payload.limit)
@@ -135,7 +251,7 @@ def discover_venues(
     payload: DiscoverVenuesRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
     if payload.city:
@@ -150,7 +266,7 @@ def search_city_venue_events(
     payload: SearchVenueEventsRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
     processed = search_venue_events(db, city=payload.city, force_refresh=payload.force_refresh)
@@ -162,11 +278,12 @@ def draft_emails(
     payload: DraftEmailsRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
-    processed = draft_newsletters(db, payload.user_id)
-    return PipelineResponse(detail="Newsletters drafted", processed=processed)
+    errors: list[str] = []
+    processed = draft_newsletters(db, payload.user_id, errors=errors)
+    return PipelineResponse(detail="Newsletters drafted", processed=processed, errors=errors)
 
 
 @router.post("/send-emails", response_model=PipelineResponse)
@@ -174,8 +291,31 @@ def send_emails(
     payload: SendEmailsRequest,
     x_cron_secret: str | None = Header(default=None),
     secret: str | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_pipeline_db),
 ) -> PipelineResponse:
     _check_internal_auth(x_cron_secret, secret)
     processed = send_newsletters(db, payload.user_id)
     return PipelineResponse(detail="Newsletters sent", processed=processed)
+
+
+@router.post("/geocode-backfill")
+def geocode_backfill(
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: Session = Depends(get_pipeline_db),
+) -> dict:
+    """Give coordinates to users and venues that have none, through the geocoding cache."""
+    _check_internal_auth(x_cron_secret, secret)
+    return backfill_coordinates(db)
+
+
+@router.post("/jobs/run")
+def run_jobs(
+    limit: int | None = Query(default=None, ge=1, le=100),
+    x_cron_secret: str | None = Header(default=None),
+    secret: str | None = Query(default=None),
+    db: Session = Depends(get_pipeline_db),
+) -> dict:
+    """Work through due background jobs (signup follow-ups, refreshes). Call from a frequent cron."""
+    _check_internal_auth(x_cron_secret, secret)
+    return run_pending_jobs(db, limit=limit)
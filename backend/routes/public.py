@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from core.config import get_settings
-from core.rate_limit import limiter
-from db.session import get_db
+from core.rate_limit import check_rate_limit, limiter
+from db.session import get_async_db, get_db
 from models import OnboardingStep, User, UserGoal, UserHobby, WaitlistEntry
 from schemas.public import (
     OnboardingStatusResponse,
@@ -15,8 +16,9 @@ from schemas.public import (
     WaitlistRequest,
     WaitlistResponse,
 )
-from services.onboarding_email import send_onboarding_email
-from services.venues import discover_major_music_venues
+from services.change_tracking import mark_user_changed
+from services.cities import get_city_registry
+from services.jobs import enqueue_job, onboarding_jobs, run_job_inline, uses_job_table
 from utils.sanitization import sanitize_text
 from utils.security import (
     CSRF_COOKIE_NAME,
@@ -28,23 +30,6 @@ from utils.security import (
 
 router = APIRouter(prefix="/api", tags=["public"])
 settings = get_settings()
-pilot_cities = {"austin", "san antonio"}
-
-
-def _normalize_city_for_pilot(city: str) -> str:
-    normalized = " ".join(city.strip().lower().replace(".", "").split())
-    if "," in normalized:
-        normalized = normalized.split(",", 1)[0].strip()
-    for suffix in (", tx", ", texas", " tx", " texas"):
-        if normalized.endswith(suffix):
-            normalized = normalized[: -len(suffix)].strip()
-            break
-    normalized = " ".join(token for token in normalized.split() if not token.isdigit())
-    return normalized
-
-
-def _is_pilot_city(city: str) -> bool:
-    return _normalize_city_for_pilot(city) in pilot_cities
 
 
 @router.get("/csrf-token")
@@ -62,17 +47,25 @@ def issue_csrf_token(response: Response) -> dict:
     return {"csrf_token": token}
 
 
-@router.post("/signup", response_model=SignupResponse)
+@router.post("/signup", response_model=SignupResponse, dependencies=[Depends(check_rate_limit)])
 @limiter.limit(settings.rate_limit_signup)
-def signup(request: Request, response: Response, payload: SignupRequest, db: Session = Depends(get_db)) -> SignupResponse:
+async def signup(
+    request: Request,
+    response: Response,
+    payload: SignupRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+) -> SignupResponse:
     ensure_csrf(request)
-    if not _is_pilot_city(payload.city):
+    registry = await db.run_sync(get_city_registry)
+    if not registry.is_pilot(payload.city):
+        pilot_names = " and ".join(registry.cities[slug].name for slug in registry.pilot_slugs())
         raise HTTPException(
             status_code=409,
-            detail="Pilot currently available only in Austin and San Antonio. Join the waitlist instead.",
+            detail=f"Pilot currently available only in {pilot_names}. Join the waitlist instead.",
         )
 
-    existing_user = db.scalar(select(User).where(User.email == payload.email.lower()))
+    existing_user = await db.scalar(select(User).where(User.email == payload.email.lower()))
     onboarding_token = generate_random_token(24)
 
     if existing_user:
@@ -104,7 +97,7 @@ def signup(request: Request, response: Response, payload: SignupRequest, db: Ses
             onboarding_token=onboarding_token,
         )
         db.add(user)
-        db.flush()
+        await db.flush()
 
     db.add(
         UserHobby(
@@ -121,9 +114,20 @@ def signup(request: Request, response: Response, payload: SignupRequest, db: Ses
             goal_types=[sanitize_text(goal) for goal in payload.goal_types],
         )
     )
+    await db.run_sync(mark_user_changed, user.id, hobbies=True, context=True)
+
+    # The onboarding email and venue priming (a slow LLM call) run after the response: queued
+    # in the same transaction as the signup when deployed, as background tasks in development.
+    follow_ups = onboarding_jobs(user.name, user.email, onboarding_token, user.city)
+    if uses_job_table():
+        for kind, job_payload, dedupe_key in follow_ups:
+            await db.run_sync(enqueue_job, kind, job_payload, dedupe_key=dedupe_key)
+    else:
+        for kind, job_payload, _dedupe_key in follow_ups:
+            background_tasks.add_task(run_job_inline, kind, job_payload)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     session_value = make_signed_value(str(user.id))
     response.set_cookie(
@@ -136,18 +140,6 @@ def signup(request: Request, response: Response, payload: SignupRequest, db: Ses
         path="/",
     )
 
-    # Fire onboarding email (non-blocking, don't fail signup if email fails)
-    try:
-        send_onboarding_email(user.name, user.email, user.onboarding_token)
-    except Exception:
-        pass  # Email failure shouldn't block signup
-
-    # Prime venue knowledge for pilot-city users on enrollment.
-    try:
-        discover_major_music_venues(db, city=user.city)
-    except Exception:
-        db.rollback()
-
     return SignupResponse(user_id=user.id, onboarding_token=user.onboarding_token)
 
 
@@ -178,12 +170,14 @@ def join_waitlist(request: Request, payload: WaitlistRequest, db: Session = Depe
 
 
 @router.get("/onboarding/{token}", response_model=OnboardingStatusResponse)
-def onboarding_status(token: str, db: Session = Depends(get_db)) -> OnboardingStatusResponse:
-    user = db.scalar(select(User).where(User.onboarding_token == token))
+async def onboarding_status(token: str, db: AsyncSession = Depends(get_async_db)) -> OnboardingStatusResponse:
+    user = await db.scalar(select(User).where(User.onboarding_token == token))
     if not user:
         raise HTTPException(status_code=404, detail="Onboarding token not found")
 
-    completed_steps = db.scalars(select(OnboardingStep.step_name).where(OnboardingStep.user_id == user.id)).all()
+    completed_steps = (
+        await db.scalars(select(OnboardingStep.step_name).where(OnboardingStep.user_id == user.id))
+    ).all()
     return OnboardingStatusResponse(user_id=user.id, email=user.email, completed_steps=sorted(set(completed_steps)))
 
 
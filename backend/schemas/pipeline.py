@@ -35,3 +35,4 @@ class SendEmailsRequest(BaseModel):
 class PipelineResponse(BaseModel):
     detail: str
     processed: int = 0
+    errors: list[str] = Field(default_factory=list)
@@ -0,0 +1,91 @@
+"""Fire concurrent requests at a running backend and report throughput and latency percentiles.
+
+    python scripts/load_test.py http://localhost:8000 --path /healthz/db --requests 2000 --concurrency 50
+    python scripts/load_test.py http://localhost:8000 --path /onboarding/<token> --path /healthz
+
+Run it before and after a change against the same deployment and database; p50/p99 move far
+less between runs than a single request's timing does.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+async def _worker(client: httpx.AsyncClient, args: argparse.Namespace, queue: asyncio.Queue, results: list) -> None:
+    while True:
+        try:
+            path = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.request(args.method, path, json=args.body)
+            outcome = str(response.status_code)
+        except httpx.HTTPError as exc:
+            outcome = type(exc).__name__
+        results.append((path, outcome, (time.perf_counter() - started) * 1000))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        # Warm-up requests open connections and pools so the measured run starts steady.
+        for path in args.path:
+            for _ in range(args.warmup):
+                await client.request(args.method, path, json=args.body)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for index in range(args.requests):
+            queue.put_nowait(args.path[index % len(args.path)])
+        results: list[tuple[str, str, float]] = []
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker(client, args, queue, results) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report: dict = {"requests": len(results), "concurrency": args.concurrency, "seconds": round(elapsed, 2)}
+    report["requests_per_second"] = round(len(results) / elapsed, 1) if elapsed else 0.0
+    for path in args.path:
+        latencies = [ms for result_path, _, ms in results if result_path == path]
+        report[path] = {
+            "statuses": dict(Counter(outcome for result_path, outcome, _ in results if result_path == path)),
+            "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50), 1),
+            "p95_ms": round(percentile(latencies, 0.95), 1),
+            "p99_ms": round(percentile(latencies, 0.99), 1),
+            "max_ms": round(max(latencies), 1) if latencies else 0.0,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base_url")
+    parser.add_argument("--path", action="append", help="request path; repeat to round-robin several (default /healthz)")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", type=json.loads, default=None, help="JSON request body")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured requests per path before the run")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    args.path = args.path or ["/healthz"]
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from typing import Any
 
-import httpx
-
 from core.config import get_settings
 
 
@@ -29,6 +27,8 @@ class OpenRouterClient:
             "Content-Type": "application/json",
         }
 
+        import httpx  # deferred so cold starts don't pay for it
+
         with httpx.Client(timeout=timeout) as client:
             response = client.post(
                 f"{self.settings.openrouter_base_url}/chat/completions",
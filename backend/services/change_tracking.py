@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from models import CityVenue, HobbyCityPair, User
+
+
+def mark_user_changed(db: Session, user_id: UUID, *, hobbies: bool = False, context: bool = False) -> None:
+    """Record that a user's inputs changed so the next incremental run picks them up.
+
+    ``hobbies`` means the raw hobby text changed and needs re-parsing; ``context`` covers
+    everything else that feeds drafting (goals, connected accounts, newsletter feedback).
+    """
+    now = datetime.now(tz=timezone.utc)
+    values: dict[str, datetime] = {}
+    if hobbies:
+        values["hobbies_changed_at"] = now
+    if context:
+        values["context_changed_at"] = now
+    if not values:
+        return
+    db.execute(update(User).where(User.id == user_id).values(**values))
+
+
+@dataclass(frozen=True)
+class RefreshPolicy:
+    """Bounds for a result set's adaptive refresh interval.
+
+    A refresh that returns the same results stretches the interval; one that returns different
+    results halves it. ``initial`` applies until there are two result sets to compare.
+    """
+
+    initial: timedelta
+    minimum: timedelta
+    maximum: timedelta
+    growth: float = 1.5
+
+    def next_interval(self, current_seconds: int | None, changed: bool) -> timedelta:
+        current = timedelta(seconds=current_seconds) if current_seconds else self.initial
+        interval = current / 2 if changed else current * self.growth
+        return min(max(interval, self.minimum), self.maximum)
+
+
+PAIR_REFRESH = RefreshPolicy(initial=timedelta(days=1), minimum=timedelta(hours=6), maximum=timedelta(days=4))
+VENUE_EVENTS_REFRESH = RefreshPolicy(initial=timedelta(days=6), minimum=timedelta(days=2), maximum=timedelta(days=14))
+VENUE_DISCOVERY_REFRESH = RefreshPolicy(initial=timedelta(days=30), minimum=timedelta(days=14), maximum=timedelta(days=90))
+
+
+def _fingerprint(keys: list) -> str:
+    return hashlib.sha256(json.dumps(sorted(keys)).encode("utf-8")).hexdigest()
+
+
+def fingerprint_events(events: list[dict]) -> str:
+    return _fingerprint(
+        [
+            (
+                str(event.get("name", "")).strip().lower(),
+                str(event.get("date", "")).strip().lower(),
+                str(event.get("location", "")).strip().lower(),
+            )
+            for event in events
+            if isinstance(event, dict)
+        ]
+    )
+
+
+def fingerprint_venues(venues: list[dict]) -> str:
+    return _fingerprint([str(venue.get("venue_name", "")).strip().lower() for venue in venues])
+
+
+def schedule_refresh(
+    policy: RefreshPolicy, current_seconds: int | None, previous_fingerprint: str | None, fingerprint: str, now: datetime
+) -> tuple[int, datetime]:
+    """(interval seconds, next refresh time) after a refresh that produced ``fingerprint``."""
+    if previous_fingerprint is None:
+        interval = policy.initial
+    else:
+        interval = policy.next_interval(current_seconds, changed=fingerprint != previous_fingerprint)
+    return int(interval.total_seconds()), now + interval
+
+
+def record_event_results(
+    target: HobbyCityPair | CityVenue, events: list[dict], now: datetime, policy: RefreshPolicy
+) -> bool:
+    """Fingerprint a refreshed result set and schedule the next refresh.
+
+    ``events_changed_at`` only moves when the fingerprint differs. A search that found nothing
+    is retried after ``policy.minimum`` and leaves the fingerprint alone, so repeated misses
+    never stretch the interval.
+    """
+    if not events:
+        target.refresh_interval_seconds = int(policy.minimum.total_seconds())
+        target.next_refresh_at = now + policy.minimum
+        return False
+    fingerprint = fingerprint_events(events)
+    previous = target.results_fingerprint
+    target.refresh_interval_seconds, target.next_refresh_at = schedule_refresh(
+        policy, target.refresh_interval_seconds, previous, fingerprint, now
+    )
+    if fingerprint == previous:
+        return False
+    target.results_fingerprint = fingerprint
+    target.events_changed_at = now
+    return True
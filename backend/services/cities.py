@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from db.session import SessionLocal, savepoint
+from models import City
+
+DEFAULT_TIMEZONE = "America/Chicago"
+
+# Used until the cities table is populated (and if it can't be read).
+DEFAULT_CITIES: tuple[dict[str, Any], ...] = (
+    {
+        "slug": "austin",
+        "name": "Austin",
+        "region": "Texas",
+        "timezone": "America/Chicago",
+        "aliases": ["austin tx", "austin texas", "atx"],
+        "is_pilot": True,
+    },
+    {
+        "slug": "san antonio",
+        "name": "San Antonio",
+        "region": "Texas",
+        "timezone": "America/Chicago",
+        "aliases": ["san antonio tx", "san antonio texas", "satx"],
+        "is_pilot": True,
+    },
+)
+
+
+def clean_city_text(value: str) -> str:
+    """Lowercase, drop periods and zip codes, and collapse whitespace: the form aliases are stored in."""
+    tokens = value.strip().lower().replace(".", "").split()
+    return " ".join(token for token in tokens if not token.isdigit())
+
+
+@dataclass(frozen=True)
+class CityInfo:
+    slug: str
+    name: str
+    region: str | None = None
+    timezone: str = DEFAULT_TIMEZONE
+    is_pilot: bool = False
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}, {self.region}" if self.region else self.name
+
+
+@dataclass
+class CityRegistry:
+    """Known cities plus a precomputed alias -> city table, so resolving any spelling is a dict hit."""
+
+    cities: dict[str, CityInfo] = field(default_factory=dict)
+    aliases: dict[str, CityInfo] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, rows: list[dict[str, Any]]) -> CityRegistry:
+        registry = cls()
+        for row in rows:
+            info = CityInfo(
+                slug=row["slug"],
+                name=row["name"],
+                region=row.get("region"),
+                timezone=row.get("timezone") or DEFAULT_TIMEZONE,
+                is_pilot=bool(row.get("is_pilot")),
+            )
+            registry.cities[info.slug] = info
+            spellings = [info.slug, info.name, *(row.get("aliases") or [])]
+            if info.region:
+                spellings += [f"{info.name} {info.region}", f"{info.name}, {info.region}"]
+            for spelling in spellings:
+                registry.aliases.setdefault(clean_city_text(spelling), info)
+        return registry
+
+    def resolve(self, value: str | None) -> CityInfo | None:
+        cleaned = clean_city_text(value or "")
+        info = self.aliases.get(cleaned)
+        if info is None and "," in cleaned:
+            # "Austin, TX 78701" and friends: the part before the first comma is the city.
+            info = self.aliases.get(cleaned.split(",", 1)[0].strip())
+        return info
+
+    def canonical(self, value: str | None) -> str:
+        """The key every city-scoped table is stored under. Unknown cities keep a cleaned key."""
+        info = self.resolve(value)
+        if info is not None:
+            return info.slug
+        return clean_city_text(value or "").split(",", 1)[0].strip()
+
+    def is_pilot(self, value: str | None) -> bool:
+        info = self.resolve(value)
+        return info is not None and info.is_pilot
+
+    def pilot_slugs(self) -> list[str]:
+        return [info.slug for info in self.cities.values() if info.is_pilot]
+
+    def timezone(self, value: str | None) -> str:
+        info = self.resolve(value)
+        return info.timezone if info is not None else DEFAULT_TIMEZONE
+
+    def label(self, value: str | None) -> str:
+        info = self.resolve(value)
+        return info.label if info is not None else self.canonical(value).title()
+
+
+_registry: CityRegistry | None = None
+_loaded_at = 0.0
+_registry_lock = threading.Lock()
+
+
+def _load_rows(db: Session) -> list[dict[str, Any]]:
+    cities = db.scalars(select(City).order_by(City.slug.asc())).all()
+    return [
+        {
+            "slug": city.slug,
+            "name": city.name,
+            "region": city.region,
+            "timezone": city.timezone,
+            "aliases": city.aliases,
+            "is_pilot": city.is_pilot,
+        }
+        for city in cities
+    ]
+
+
+def get_city_registry(db: Session | None = None) -> CityRegistry:
+    """Return the city registry, reloading it from the ``cities`` table at most once per TTL.
+
+    Adding a city or alias is a row change that every instance picks up within
+    ``city_registry_ttl_seconds``. Pass ``db`` to load through the caller's session.
+    """
+    global _registry, _loaded_at
+    ttl = get_settings().city_registry_ttl_seconds
+    if _registry is not None and time.monotonic() - _loaded_at < ttl:
+        return _registry
+    with _registry_lock:
+        if _registry is not None and time.monotonic() - _loaded_at < ttl:
+            return _registry
+        try:
+            if db is not None:
+                # A savepoint keeps a failed load from aborting the caller's transaction.
+                with savepoint(db):
+                    rows = _load_rows(db)
+            else:
+                with SessionLocal() as session:
+                    rows = _load_rows(session)
+        except Exception:
+            # Keep serving the last good registry; retry on the next call.
+            if _registry is not None:
+                return _registry
+            rows = []
+        _registry = CityRegistry.build(rows or list(DEFAULT_CITIES))
+        _loaded_at = time.monotonic()
+        return _registry
+
+
+def normalize_city(value: str | None) -> str:
+    return get_city_registry().canonical(value)
@@ -5,19 +5,25 @@ from datetime import datetime, timezone
 from html import escape
 import json
 import re
+from typing import Callable
 from urllib.parse import quote_plus
 from uuid import UUID
 
-import httpx
-from sqlalchemy import inspect, select, text
+from sqlalchemy import ColumnElement, inspect, select, text
 from sqlalchemy.orm import Session
 
 from core.config import get_settings
+from db.pagination import iter_keyset_chunks
+from db.session import savepoint
 from models import HobbyCityPair, Newsletter, OAuthToken, User, UserGoal, UserHobby
 from services.ai import openrouter_client
+from services.cities import normalize_city
+from services.event_dates import event_time
+from services.event_store import infer_category, infer_price_tier, load_event_geo_index
+from services.geo import EventGeoIndex
 from services.google_cal import get_calendar_availability
 from services.spotify import get_recent_tracks
-from services.token_crypto import cipher
+from services.token_crypto import get_cipher
 from services.venues import get_cached_venue_events_for_city
 
 
@@ -53,27 +59,6 @@ def _truncate(value: str, limit: int) -> str:
     return cleaned[: max(0, limit - 1)].rstrip() + "..."
 
 
-def _infer_category(event: dict) -> str:
-    for key in ("category", "type"):
-        raw = str(event.get(key, "")).strip()
-        if raw:
-            return raw.title()
-
-    haystack = f"{event.get('name', '')} {event.get('why', '')}".lower()
-    keyword_map = (
-        ("Music", ("music", "concert", "dj", "band", "show", "live")),
-        ("Food", ("food", "tasting", "brunch", "dinner", "restaurant", "market")),
-        ("Social", ("mixer", "social", "networking", "meetup", "singles")),
-        ("Outdoors", ("hike", "run", "trail", "outdoor", "park", "bike")),
-        ("Arts", ("gallery", "museum", "art", "film", "photo", "theater")),
-        ("Fitness", ("fitness", "yoga", "pilates", "workout", "wellness")),
-    )
-    for category, words in keyword_map:
-        if any(word in haystack for word in words):
-            return category
-    return "Featured"
-
-
 def _category_emoji(category: str) -> str:
     key = category.lower()
     if key == "music":
@@ -91,33 +76,13 @@ def _category_emoji(category: str) -> str:
     return "✨"
 
 
-def _infer_price_indicator(event: dict) -> str:
-    for key in ("price_indicator", "price", "cost"):
-        raw = str(event.get(key, "")).strip().lower()
-        if raw in {"$", "$$", "$$$", "$$$$"}:
-            return raw
-        if "free" in raw:
-            return "Free"
-        digits = "".join(ch for ch in raw if ch.isdigit() or ch == ".")
-        if digits:
-            try:
-                amount = float(digits)
-                if amount == 0:
-                    return "Free"
-                if amount <= 15:
-                    return "$"
-                if amount <= 40:
-                    return "$$"
-                if amount <= 100:
-                    return "$$$"
-                return "$$$$"
-            except ValueError:
-                continue
-    return "$$"
-
-
 def _format_event_date(event: dict) -> str:
     raw = str(event.get("date", "")).strip()
+    start = event_time(event, "start_time")
+    if start and event.get("date_precision") == "time":
+        return start.strftime("%a, %b %-d · %-I:%M %p")
+    if start and event.get("date_precision") == "day":
+        return start.strftime("%a, %b %-d")
     if not raw:
         return "Date TBA"
     return raw
@@ -126,13 +91,13 @@ def _format_event_date(event: dict) -> str:
 def _build_event_groups(events: list[dict], city: str) -> dict[str, list[dict]]:
     grouped: dict[str, list[dict]] = defaultdict(list)
     for event in events[:8]:
-        category = _infer_category(event)
+        category = infer_category(event)
         grouped[category].append(
             {
                 "name": _truncate(str(event.get("name", "Event")).strip() or "Event", 90),
                 "date": _format_event_date(event),
                 "location": _truncate(str(event.get("location", city)).strip() or city, 80),
-                "price": _infer_price_indicator(event),
+                "price": infer_price_tier(event),
                 "summary": _truncate(str(event.get("why", "Worth checking out this week.")).strip(), 170),
                 "url": str(event.get("url", "")).strip() or "https://itk-so.vercel.app",
             }
@@ -436,7 +401,7 @@ def _collect_music_context(db: Session, user: User) -> list[dict]:
     if not spotify_token:
         return []
     try:
-        access_token = cipher.decrypt(spotify_token.access_token)
+        access_token = get_cipher().decrypt(spotify_token.access_token)
     except Exception:
         access_token = spotify_token.access_token
     return get_recent_tracks(access_token)
@@ -447,13 +412,18 @@ def _collect_calendar_context(db: Session, user: User) -> list[dict]:
     if not google_token:
         return []
     try:
-        access_token = cipher.decrypt(google_token.access_token)
+        access_token = get_cipher().decrypt(google_token.access_token)
     except Exception:
         access_token = google_token.access_token
     return get_calendar_availability(access_token)
 
 
-def draft_newsletter_for_user(db: Session, user: User) -> Newsletter:
+def draft_newsletter_for_user(db: Session, user: User, event_indexes: dict[str, EventGeoIndex] | None = None) -> Newsletter:
+    """Draft one user's newsletter from events within their ``event_radius_miles``.
+
+    ``event_indexes`` caches each city's event index across a batch, so the events query and
+    index build happen once per city rather than once per user.
+    """
     latest_hobbies = db.scalars(
         select(UserHobby).where(UserHobby.user_id == user.id).order_by(UserHobby.created_at.desc())
     ).first()
@@ -463,15 +433,25 @@ def draft_newsletter_for_user(db: Session, user: User) -> Newsletter:
     goals_raw_text = latest_goals.raw_text if latest_goals else ""
     goal_types = latest_goals.goal_types if latest_goals else []
 
-    pairs = db.scalars(
-        select(HobbyCityPair).where(HobbyCityPair.city == user.city.lower()).order_by(HobbyCityPair.frequency.desc()).limit(4)
-    ).all()
+    city = normalize_city(user.city)
+    if event_indexes is None:
+        event_indexes = {}
+    if city not in event_indexes:
+        event_indexes[city] = load_event_geo_index(db, city)
+    event_index = event_indexes[city]
+    events = event_index.nearby(user.lat, user.lng, user.event_radius_miles, limit=12)
+    if len(event_index) == 0:
+        # Cities whose searches predate the events table still only have JSONB result blobs. A city
+        # with indexed events never falls back: nothing within the user's radius stays nothing.
+        pairs = db.scalars(
+            select(HobbyCityPair).where(HobbyCityPair.city == city).order_by(HobbyCityPair.frequency.desc()).limit(4)
+        ).all()
 
-    pair_events: list[dict] = []
-    for pair in pairs:
-        pair_events.extend(pair.cached_results[:2])
-    venue_events = get_cached_venue_events_for_city(db, user.city, limit=8)
-    events = _merge_event_sources(primary_events=venue_events, secondary_events=pair_events)
+        pair_events: list[dict] = []
+        for pair in pairs:
+            pair_events.extend(pair.cached_results[:2])
+        venue_events = get_cached_venue_events_for_city(db, user.city, limit=8)
+        events = _merge_event_sources(primary_events=venue_events, secondary_events=pair_events)
     if not events:
         events = [
             {"name": "City event roundup", "date": "This week", "location": user.city, "url": "https://itk-so.vercel.app"}
@@ -511,19 +491,41 @@ def draft_newsletter_for_user(db: Session, user: User) -> Newsletter:
         events_included=events,
     )
     db.add(newsletter)
+    user.newsletter_drafted_at = datetime.now(tz=timezone.utc)
     db.commit()
     db.refresh(newsletter)
     return newsletter
 
 
-def draft_newsletters(db: Session, user_id: UUID | None = None) -> int:
+def draft_newsletters(
+    db: Session,
+    user_id: UUID | None = None,
+    errors: list[str] | None = None,
+    condition: ColumnElement[bool] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Draft a newsletter per subscribed user; ``on_progress`` gets the running count after each user."""
     query = select(User).where(User.is_subscribed.is_(True))
     if user_id:
         query = query.where(User.id == user_id)
-    users = db.scalars(query).all()
-    for user in users:
-        draft_newsletter_for_user(db, user)
-    return len(users)
+    if condition is not None:
+        query = query.where(condition)
+    drafted = 0
+    event_indexes: dict[str, EventGeoIndex] = {}
+    for users in iter_keyset_chunks(db, query, User.id, key=lambda user: user.id):
+        for user in users:
+            current_user_id = user.id
+            try:
+                with savepoint(db):
+                    draft_newsletter_for_user(db, user, event_indexes=event_indexes)
+            except Exception as e:
+                if errors is not None:
+                    errors.append(f"draft_newsletters[{current_user_id}]: {str(e)}")
+                continue
+            drafted += 1
+            if on_progress is not None:
+                on_progress(drafted)
+    return drafted
 
 
 def _send_email_via_resend(to_email: str, subject: str, html_content: str, reply_to: str | None = None) -> None:
@@ -540,6 +542,8 @@ def _send_email_via_resend(to_email: str, subject: str, html_content: str, reply
     if reply_to:
         payload["reply_to"] = [reply_to]
 
+    import httpx
+
     with httpx.Client(timeout=20) as client:
         response = client.post(
             "https://api.resend.com/emails",
@@ -549,21 +553,23 @@ def _send_email_via_resend(to_email: str, subject: str, html_content: str, reply
         response.raise_for_status()
 
 
-def send_newsletters(db: Session, user_id: UUID | None = None) -> int:
+def send_newsletters(db: Session, user_id: UUID | None = None, condition: ColumnElement[bool] | None = None) -> int:
     query = select(Newsletter).where(Newsletter.sent_at.is_(None))
     if user_id:
         query = query.where(Newsletter.user_id == user_id)
+    if condition is not None:
+        query = query.where(condition)
 
-    newsletters = db.scalars(query).all()
     sent_count = 0
-    for newsletter in newsletters:
-        user = db.get(User, newsletter.user_id)
-        if not user or not user.is_subscribed:
-            continue
-        reply_to = _build_reply_to_address(newsletter.id)
-        _send_email_via_resend(user.email, newsletter.subject, newsletter.html_content, reply_to=reply_to)
-        newsletter.sent_at = datetime.now(tz=timezone.utc)
-        sent_count += 1
+    for newsletters in iter_keyset_chunks(db, query, Newsletter.id, key=lambda newsletter: newsletter.id):
+        for newsletter in newsletters:
+            user = db.get(User, newsletter.user_id)
+            if not user or not user.is_subscribed:
+                continue
+            reply_to = _build_reply_to_address(newsletter.id)
+            _send_email_via_resend(user.email, newsletter.subject, newsletter.html_content, reply_to=reply_to)
+            newsletter.sent_at = datetime.now(tz=timezone.utc)
+            sent_count += 1
 
     db.commit()
     return sent_count
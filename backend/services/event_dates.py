@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+from services.cities import get_city_registry
+
+
+_WEEKDAYS = {
+    "mon": 0, "monday": 0, "tue": 1, "tues": 1, "tuesday": 1, "wed": 2, "weds": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3, "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5, "sun": 6, "sunday": 6,
+}
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3, "apr": 4, "april": 4,
+    "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7, "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10, "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+_MONTH_PATTERN = "|".join(sorted(_MONTHS, key=len, reverse=True))
+_WEEKDAY_PATTERN = "|".join(sorted(_WEEKDAYS, key=len, reverse=True))
+
+_MERIDIEM = r"(a\.?m\.?|p\.?m\.?)"
+_TIME_RE = re.compile(rf"\b(\d{{1,2}})(?::(\d{{2}}))?\s*{_MERIDIEM}(?![a-z])|\b([01]?\d|2[0-3]):([0-5]\d)\b")
+# "7-10pm", "8 – 11 PM", "11am to 2pm": the start's meridiem is optional and borrowed from the end's.
+_TIME_RANGE_RE = re.compile(
+    rf"\b(\d{{1,2}})(?::(\d{{2}}))?\s*{_MERIDIEM}?\s*(?:-|–|—|to)\s*(\d{{1,2}})(?::(\d{{2}}))?\s*{_MERIDIEM}(?![a-z])"
+)
+_MONTH_DAY_RE = re.compile(rf"\b({_MONTH_PATTERN})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\b(?:,?\s*(\d{{4}}))?")
+_DAY_MONTH_RE = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_PATTERN})\b(?:,?\s*(\d{{4}}))?")
+_NUMERIC_DATE_RE = re.compile(r"\b(\d{1,2})/(\d{1,2})(?:/(\d{2,4}))?\b")
+_WEEKDAY_RE = re.compile(rf"\b({_WEEKDAY_PATTERN})\b\.?")
+
+
+@dataclass(frozen=True)
+class ParsedEventDate:
+    """Normalized event timing. ``precision`` is "time", "day" or "window"; ``None`` when unparsed."""
+
+    start: datetime | None = None
+    end: datetime | None = None
+    precision: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.start is not None
+
+
+def city_timezone(city: str) -> str:
+    return get_city_registry().timezone(city)
+
+
+def _clock(hour: str, minute: str | None, meridiem: str | None) -> time | None:
+    hours, minutes = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem.startswith("p") else 0)
+    if hours < 24 and minutes < 60:
+        return time(hours, minutes)
+    return None
+
+
+def _parse_times(text: str) -> list[time]:
+    """Times in ``text`` in reading order; a range contributes its start then its end."""
+    found: list[tuple[int, time]] = []
+    ranges: list[tuple[int, int]] = []
+    for match in _TIME_RANGE_RE.finditer(text):
+        end = _clock(match.group(4), match.group(5), match.group(6))
+        start = _clock(match.group(1), match.group(2), match.group(3) or match.group(6))
+        if start is None or end is None:
+            continue
+        if not match.group(3) and start > end:
+            # "11-2pm" starts in the morning.
+            start = _clock(match.group(1), match.group(2), "am" if match.group(6).startswith("p") else "pm")
+        found += [(match.start(1), start), (match.start(4), end)]
+        ranges.append(match.span())
+
+    for match in _TIME_RE.finditer(text):
+        if any(start <= match.start() < end for start, end in ranges):
+            continue
+        if match.group(3):
+            parsed = _clock(match.group(1), match.group(2), match.group(3))
+        else:
+            parsed = _clock(match.group(4), match.group(5), None)
+        if parsed is not None:
+            found.append((match.start(), parsed))
+    return [parsed for _, parsed in sorted(found, key=lambda item: item[0])]
+
+
+def _resolve_year(month: int, day: int, year: int | None, today: date) -> date | None:
+    try:
+        if year:
+            return date(year if year > 99 else 2000 + year, month, day)
+        candidate = date(today.year, month, day)
+        # Listings rarely mention the year; dates well in the past belong to next year.
+        if candidate < today - timedelta(days=60):
+            candidate = date(today.year + 1, month, day)
+        return candidate
+    except ValueError:
+        return None
+
+
+def _find_day(text: str, today: date) -> tuple[date | None, date | None, str | None]:
+    """Return (first day, exclusive end day, precision) for the calendar part of ``text``."""
+    if re.search(r"\b(today|tonight)\b", text):
+        return today, None, "day"
+    if re.search(r"\btomorrow\b", text):
+        return today + timedelta(days=1), None, "day"
+    if re.search(r"\bthis weekend\b", text) or text == "weekend":
+        saturday = today - timedelta(days=1) if today.weekday() == 6 else today + timedelta(days=5 - today.weekday())
+        return saturday, saturday + timedelta(days=2), "window"
+    if re.search(r"\bnext week\b", text):
+        monday = today + timedelta(days=7 - today.weekday())
+        return monday, monday + timedelta(days=7), "window"
+    if re.search(r"\b(this week|weekly|every week)\b", text):
+        return today, today + timedelta(days=7), "window"
+
+    match = _MONTH_DAY_RE.search(text)
+    if match:
+        day = _resolve_year(_MONTHS[match.group(1)], int(match.group(2)), int(match.group(3) or 0) or None, today)
+        if day:
+            return day, None, "day"
+    match = _DAY_MONTH_RE.search(text)
+    if match:
+        day = _resolve_year(_MONTHS[match.group(2)], int(match.group(1)), int(match.group(3) or 0) or None, today)
+        if day:
+            return day, None, "day"
+    match = _NUMERIC_DATE_RE.search(text)
+    if match:
+        day = _resolve_year(int(match.group(1)), int(match.group(2)), int(match.group(3) or 0) or None, today)
+        if day:
+            return day, None, "day"
+    match = _WEEKDAY_RE.search(text)
+    if match:
+        offset = (_WEEKDAYS[match.group(1)] - today.weekday()) % 7
+        return today + timedelta(days=offset), None, "day"
+    return None, None, None
+
+
+@lru_cache(maxsize=2048)
+def _parse_cached(raw: str, tz_name: str, today: date) -> tuple[ParsedEventDate, bool]:
+    """Parse against ``today``; the flag marks a bare time, which the caller may roll to tomorrow."""
+    tz = ZoneInfo(tz_name)
+    try:
+        parsed = datetime.fromisoformat(raw)
+    except ValueError:
+        parsed = None
+    if parsed is not None:
+        has_time = "T" in raw or " " in raw.strip()
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=tz)
+        if has_time:
+            return ParsedEventDate(start=parsed, precision="time"), False
+        return ParsedEventDate(start=parsed, end=parsed + timedelta(days=1), precision="day"), False
+
+    text = " ".join(raw.lower().split())
+    first_day, end_day, precision = _find_day(text, today)
+    times = _parse_times(text)
+    bare_time = first_day is None
+    if bare_time:
+        if not times:
+            return ParsedEventDate(), False
+        first_day, precision = today, "day"
+
+    if precision == "window":
+        start = datetime.combine(first_day, time(0, 0), tzinfo=tz)
+        return ParsedEventDate(start=start, end=datetime.combine(end_day, time(0, 0), tzinfo=tz), precision="window"), False
+
+    if not times:
+        start = datetime.combine(first_day, time(18, 0) if "tonight" in text else time(0, 0), tzinfo=tz)
+        return ParsedEventDate(start=start, end=datetime.combine(first_day + timedelta(days=1), time(0, 0), tzinfo=tz), precision="day"), False
+
+    start = datetime.combine(first_day, times[0], tzinfo=tz)
+    end = None
+    if len(times) > 1:
+        end = datetime.combine(first_day, times[1], tzinfo=tz)
+        if end <= start:
+            end += timedelta(days=1)
+    return ParsedEventDate(start=start, end=end, precision="time"), bare_time
+
+
+def parse_event_date(raw: str, city: str, now: datetime | None = None) -> ParsedEventDate:
+    """Resolve a free-text event date to city-local start/end datetimes.
+
+    Results are memoized per (text, timezone, local day), since the same strings ("This week",
+    "Sat 8pm") repeat across every venue and pair in a run.
+    """
+    cleaned = " ".join(str(raw or "").split())
+    if not cleaned:
+        return ParsedEventDate()
+    tz_name = city_timezone(city)
+    reference = (now or datetime.now(tz=timezone.utc)).astimezone(ZoneInfo(tz_name))
+    parsed, bare_time = _parse_cached(cleaned, tz_name, reference.date())
+    if bare_time and parsed.start < reference:
+        # A bare time ("8pm") means its next occurrence, which is tomorrow once today's has passed.
+        return replace(
+            parsed, start=parsed.start + timedelta(days=1), end=parsed.end + timedelta(days=1) if parsed.end else None
+        )
+    return parsed
+
+
+def annotate_event_dates(events: list[dict], city: str, now: datetime | None = None) -> list[dict]:
+    """Attach ``start_time``/``end_time`` (ISO) and parse flags to each event in place."""
+    for event in events:
+        parsed = parse_event_date(str(event.get("date", "")), city, now=now)
+        event["start_time"] = parsed.start.isoformat() if parsed.start else None
+        event["end_time"] = parsed.end.isoformat() if parsed.end else None
+        event["date_precision"] = parsed.precision
+        event["date_parse_failed"] = not parsed.ok
+    return events
+
+
+def event_time(event: dict, key: str = "start_time") -> datetime | None:
+    """Read back an ISO timestamp written by ``annotate_event_dates``."""
+    raw = event.get(key)
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(str(raw))
+    except ValueError:
+        return None
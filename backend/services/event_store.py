@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from models import Event
+from services.event_dates import event_time
+from services.geo import EventGeoIndex
+from services.geocoding import geocode_many
+
+_GEO_INDEX_MAX_EVENTS = 500
+
+
+def infer_category(event: dict) -> str:
+    for key in ("category", "type"):
+        raw = str(event.get(key, "")).strip()
+        if raw:
+            return raw.title()
+
+    haystack = f"{event.get('name', '')} {event.get('why', '')}".lower()
+    keyword_map = (
+        ("Music", ("music", "concert", "dj", "band", "show", "live")),
+        ("Food", ("food", "tasting", "brunch", "dinner", "restaurant", "market")),
+        ("Social", ("mixer", "social", "networking", "meetup", "singles")),
+        ("Outdoors", ("hike", "run", "trail", "outdoor", "park", "bike")),
+        ("Arts", ("gallery", "museum", "art", "film", "photo", "theater")),
+        ("Fitness", ("fitness", "yoga", "pilates", "workout", "wellness")),
+    )
+    for category, words in keyword_map:
+        if any(word in haystack for word in words):
+            return category
+    return "Featured"
+
+
+def infer_price_tier(event: dict) -> str:
+    for key in ("price_indicator", "price", "cost"):
+        raw = str(event.get(key, "")).strip().lower()
+        if raw in {"$", "$$", "$$$", "$$$$"}:
+            return raw
+        if "free" in raw:
+            return "Free"
+        digits = "".join(ch for ch in raw if ch.isdigit() or ch == ".")
+        if digits:
+            try:
+                amount = float(digits)
+                if amount == 0:
+                    return "Free"
+                if amount <= 15:
+                    return "$"
+                if amount <= 40:
+                    return "$$"
+                if amount <= 100:
+                    return "$$$"
+                return "$$$$"
+            except ValueError:
+                continue
+    return "$$"
+
+
+def event_fingerprint(event: dict) -> str:
+    """Identity of an event within a city; matches the dedupe key used when merging sources."""
+    key = "|".join(str(event.get(field, "")).strip().lower() for field in ("name", "date", "location"))
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _event_address(event: dict) -> str:
+    return str(event.get("address") or event.get("location") or "").strip()
+
+
+def replace_source_events(
+    db: Session,
+    *,
+    city: str,
+    source: str,
+    source_key: str,
+    events: list[dict],
+    now: datetime,
+    coordinates: tuple[float, float] | None = None,
+) -> int:
+    """Make the ``events`` rows for one pair or venue match its latest search results.
+
+    Rows the source no longer returns are deleted and the rest are upserted on
+    ``(city, fingerprint)``. ``coordinates`` places every event (a venue's location);
+    otherwise each event is geocoded from its address. The caller owns the transaction.
+    """
+    points = {} if coordinates is not None else geocode_many(
+        db, (_event_address(event) for event in events if isinstance(event, dict)), city
+    )
+    rows: dict[str, dict] = {}
+    for event in events:
+        if not isinstance(event, dict):
+            continue
+        name = str(event.get("name", "")).strip()
+        if not name:
+            continue
+        fingerprint = event_fingerprint(event)
+        point = coordinates or points.get(_event_address(event))
+        rows[fingerprint] = {
+            "city": city,
+            "name": name[:300],
+            "start_time": event_time(event, "start_time"),
+            "end_time": event_time(event, "end_time"),
+            "venue": str(event.get("location", "")).strip()[:240] or None,
+            "lat": point[0] if point else None,
+            "lng": point[1] if point else None,
+            "price_tier": infer_price_tier(event),
+            "category": infer_category(event)[:60],
+            "url": str(event.get("url", "")).strip() or None,
+            "source": source,
+            "source_key": source_key,
+            "fingerprint": fingerprint,
+            "payload": event,
+            "last_seen_at": now,
+        }
+
+    stale = delete(Event).where(Event.source_key == source_key)
+    if rows:
+        stale = stale.where(Event.fingerprint.not_in(list(rows)))
+    db.execute(stale)
+
+    if rows:
+        statement = insert(Event).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            constraint="uq_events_city_fingerprint",
+            set_={
+                column: statement.excluded[column]
+                for column in (
+                    "name",
+                    "start_time",
+                    "end_time",
+                    "venue",
+                    "lat",
+                    "lng",
+                    "price_tier",
+                    "category",
+                    "url",
+                    "source",
+                    "source_key",
+                    "payload",
+                    "last_seen_at",
+                )
+            },
+        )
+        db.execute(statement)
+    return len(rows)
+
+
+class _EventIndexCache:
+    """Process-wide cache of per-city event indexes, keyed by the city's event data version.
+
+    Only the newest version per city is kept. Entries also age out after
+    ``event_index_ttl_seconds``, since events that have ended drop out of a fresh build.
+    Indexes are read-only once built, so threads share them.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, tuple[tuple, float, EventGeoIndex]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, city: str, version: tuple) -> EventGeoIndex | None:
+        with self._lock:
+            entry = self._entries.get(city)
+        if entry is None or entry[0] != version:
+            return None
+        if time.monotonic() - entry[1] >= get_settings().event_index_ttl_seconds:
+            return None
+        return entry[2]
+
+    def put(self, city: str, version: tuple, index: EventGeoIndex) -> None:
+        with self._lock:
+            self._entries[city] = (version, time.monotonic(), index)
+
+    def invalidate(self, city: str) -> None:
+        with self._lock:
+            self._entries.pop(city, None)
+
+
+_event_index_cache = _EventIndexCache()
+
+
+def _event_data_version(db: Session, city: str) -> tuple:
+    # Every replace either upserts rows (moving max(last_seen_at)) or only deletes (moving the
+    # count), so the pair changes whenever the city's events do, on any instance.
+    return tuple(db.execute(select(func.count(), func.max(Event.last_seen_at)).where(Event.city == city)).one())
+
+
+def invalidate_event_index(city: str) -> None:
+    """Drop this process' index for ``city``; call after committing new events for it."""
+    _event_index_cache.invalidate(city)
+
+
+def load_event_geo_index(db: Session, city: str) -> EventGeoIndex:
+    """Spatial index over a city's upcoming events, in drafting order (venue picks first).
+
+    Events that have already ended are skipped; events whose date could not be parsed are
+    kept but sorted after dated ones. Indexes are shared per process until the city's events
+    change, so each ``/run-user`` call costs one aggregate query instead of a rebuild.
+    """
+    version = _event_data_version(db, city)
+    cached = _event_index_cache.get(city, version)
+    if cached is not None:
+        return cached
+
+    now = datetime.now(tz=timezone.utc)
+    query = (
+        select(Event.payload, Event.lat, Event.lng)
+        .where(Event.city == city, or_(Event.start_time.is_(None), Event.start_time >= now, Event.end_time >= now))
+        .order_by((Event.source == "venue").desc(), Event.start_time.asc().nulls_last(), Event.last_seen_at.desc())
+        .limit(_GEO_INDEX_MAX_EVENTS)
+    )
+    index = EventGeoIndex(db.execute(query).all())
+    _event_index_cache.put(city, version, index)
+    return index
@@ -3,13 +3,20 @@ from __future__ import annotations
 import json
 import re
 from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Collection
+from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import ColumnElement, func, or_, select
 from sqlalchemy.orm import Session
 
 from core.config import get_settings
-from models import HobbyCityPair
+from models import HobbyCityPair, HobbyTag, User, UserHobby
 from services.ai import openrouter_client
+from services.change_tracking import PAIR_REFRESH, record_event_results
+from services.cities import normalize_city
+from services.event_dates import annotate_event_dates
+from services.event_store import invalidate_event_index, replace_source_events
+from services.refresh_planner import plan_refresh
 
 
 def _build_search_prompt(hobby: str, city: str) -> str:
@@ -71,12 +78,44 @@ def _extract_json(text: str) -> list[dict]:
     return []
 
 
-def search_events_for_pair(db: Session, pair: HobbyCityPair) -> list[dict]:
+def pair_needs_search(now: datetime) -> ColumnElement[bool]:
+    return or_(
+        HobbyCityPair.next_refresh_at.is_(None),
+        HobbyCityPair.next_refresh_at <= now,
+        func.jsonb_array_length(HobbyCityPair.cached_results) == 0,
+    )
+
+
+def enqueue_pair_refresh(db: Session, pair: HobbyCityPair) -> None:
+    # services.jobs imports this module for its handlers, so resolve it at call time.
+    from services.jobs import enqueue_job
+
+    enqueue_job(db, "refresh_pair_events", {"pair_id": str(pair.id)}, dedupe_key=f"refresh_pair_events:{pair.id}")
+
+
+def search_events_for_pair(
+    db: Session, pair: HobbyCityPair, allow_stale: bool = False, force: bool = False
+) -> list[dict]:
+    """Return a pair's events, searching again once its refresh is due.
+
+    With ``allow_stale`` the caller never waits on a search: a due pair gets a queued
+    background refresh, and its cached results are still served while they are within
+    ``pair_stale_grace_seconds`` of going stale. Older (or empty) results come back as ``[]``.
+    ``force`` searches before the refresh is due, for pairs planned ahead of a send.
+    """
     now = datetime.now(tz=timezone.utc)
-    if pair.last_searched and pair.last_searched > (now - timedelta(days=1)) and pair.cached_results:
+    if not force and pair.next_refresh_at and pair.next_refresh_at > now and pair.cached_results:
         return pair.cached_results
 
     settings = get_settings()
+    if allow_stale:
+        enqueue_pair_refresh(db, pair)
+        db.commit()
+        grace = timedelta(seconds=settings.pair_stale_grace_seconds)
+        if pair.next_refresh_at and pair.next_refresh_at + grace > now and pair.cached_results:
+            return pair.cached_results
+        return []
+
     hobby = pair.hobby_tag.tag_name
     city = pair.city
 
@@ -99,19 +138,81 @@ def search_events_for_pair(db: Session, pair: HobbyCityPair) -> list[dict]:
     # Tag each event with the hobby that found it
     for event in events:
         event["source_hobby"] = hobby
+    annotate_event_dates(events, normalize_city(city), now=now)
 
     pair.cached_results = events if events else []
     pair.last_searched = now
+    record_event_results(pair, pair.cached_results, now, PAIR_REFRESH)
+    replace_source_events(
+        db,
+        city=normalize_city(city),
+        source="pair",
+        source_key=str(pair.id),
+        events=pair.cached_results,
+        now=now,
+    )
     db.commit()
+    invalidate_event_index(normalize_city(city))
     return events
 
 
-def search_events_for_pairs(db: Session, city: str | None = None, limit: int = 50) -> int:
-    query = select(HobbyCityPair).order_by(HobbyCityPair.frequency.desc()).limit(limit)
-    if city:
-        query = query.where(HobbyCityPair.city == city.strip().lower())
-
-    pairs = db.scalars(query).all()
+def refresh_pair_events(db: Session, pair_id: UUID) -> list[dict]:
+    pair = db.get(HobbyCityPair, pair_id)
+    if pair is None:
+        return []
+    return search_events_for_pair(db, pair)
+
+
+def search_events_for_user(db: Session, user_id: UUID) -> dict[str, Any]:
+    """Serve-or-queue the pairs behind one user's hobbies, without waiting on any search."""
+    user = db.get(User, user_id)
+    latest_hobbies = db.scalars(
+        select(UserHobby).where(UserHobby.user_id == user_id).order_by(UserHobby.created_at.desc())
+    ).first()
+    if not user or not latest_hobbies or not latest_hobbies.parsed_tags:
+        return {"pairs": 0, "served": 0, "queued": 0}
+
+    pairs = db.scalars(
+        select(HobbyCityPair)
+        .join(HobbyTag, HobbyTag.id == HobbyCityPair.hobby_tag_id)
+        .where(HobbyCityPair.city == normalize_city(user.city), HobbyTag.tag_name.in_(latest_hobbies.parsed_tags))
+    ).all()
+    now = datetime.now(tz=timezone.utc)
+    summary = {"pairs": len(pairs), "served": 0, "queued": 0}
     for pair in pairs:
-        search_events_for_pair(db, pair)
+        due = not (pair.next_refresh_at and pair.next_refresh_at > now and pair.cached_results)
+        if search_events_for_pair(db, pair, allow_stale=True):
+            summary["served"] += 1
+        if due:
+            summary["queued"] += 1
+    return summary
+
+
+def search_events_for_pairs(
+    db: Session,
+    city: str | None = None,
+    limit: int = 50,
+    stale_only: bool = False,
+    cities: Collection[str] | None = None,
+    on_progress: Callable[[int], None] | None = None,
+) -> int:
+    """Search the pairs the refresh planner ranks highest, up to ``limit`` searches.
+
+    A full run also refreshes pairs that would go stale before their city's next send, so
+    planned pairs are searched even when not yet due; ``stale_only`` plans only pairs that
+    are due now. ``on_progress`` gets the running count after each search.
+    """
+    if city:
+        city_key = normalize_city(city)
+        cities = [city_key] if cities is None or city_key in cities else []
+
+    # Spend the budget on the pairs that matter most by the next send, not just the most common ones.
+    pair_ids = plan_refresh(db, budget=limit, cities=cities, include_venues=False, due_only=stale_only).ids("pair")
+    pairs_by_id = {pair.id: pair for pair in db.scalars(select(HobbyCityPair).where(HobbyCityPair.id.in_(pair_ids)))}
+    pairs = [pairs_by_id[pair_id] for pair_id in pair_ids if pair_id in pairs_by_id]
+
+    for searched, pair in enumerate(pairs, start=1):
+        search_events_for_pair(db, pair, force=True)
+        if on_progress is not None:
+            on_progress(searched)
     return len(pairs)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Iterable
+
+EARTH_RADIUS_MILES = 3958.8
+MILES_PER_DEGREE_LAT = 69.0
+# ~7 miles per cell: small enough that a typical radius touches a handful of cells.
+GRID_CELL_DEGREES = 0.1
+
+
+def _cell(lat: float, lng: float) -> tuple[int, int]:
+    return math.floor(lat / GRID_CELL_DEGREES), math.floor(lng / GRID_CELL_DEGREES)
+
+
+def _unit_vector(lat: float, lng: float) -> tuple[float, float, float]:
+    phi, lam = math.radians(lat), math.radians(lng)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+class EventGeoIndex:
+    """A city's upcoming events bucketed on a lat/lng grid, built once and queried per user.
+
+    Events keep their drafting order. A radius query only looks at events in the grid cells
+    the radius can reach, and compares precomputed unit vectors against the cosine of the
+    radius' central angle, which is the haversine test without per-event trigonometry.
+    Events without coordinates are always eligible, since there is no distance to hold
+    against them.
+    """
+
+    def __init__(self, events: Iterable[tuple[dict, float | None, float | None]]) -> None:
+        self._payloads: list[dict] = []
+        self._vectors: list[tuple[float, float, float] | None] = []
+        self._cells: dict[tuple[int, int], list[int]] = {}
+        self._unlocated: list[int] = []
+        for position, (payload, lat, lng) in enumerate(events):
+            self._payloads.append(payload)
+            if lat is None or lng is None:
+                self._vectors.append(None)
+                self._unlocated.append(position)
+                continue
+            self._vectors.append(_unit_vector(lat, lng))
+            self._cells.setdefault(_cell(lat, lng), []).append(position)
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def nearby(self, lat: float | None, lng: float | None, radius_miles: float, limit: int) -> list[dict]:
+        if lat is None or lng is None:
+            return [dict(payload) for payload in self._payloads[:limit]]
+
+        lat_span = radius_miles / MILES_PER_DEGREE_LAT
+        lng_span = radius_miles / (MILES_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        min_row, min_col = _cell(lat - lat_span, lng - lng_span)
+        max_row, max_col = _cell(lat + lat_span, lng + lng_span)
+        x, y, z = _unit_vector(lat, lng)
+        min_dot = math.cos(min(radius_miles / EARTH_RADIUS_MILES, math.pi))
+
+        vectors = self._vectors
+        matches = list(self._unlocated)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for position in self._cells.get((row, col), ()):
+                    ex, ey, ez = vectors[position]
+                    if ex * x + ey * y + ez * z >= min_dot:
+                        matches.append(position)
+        return [dict(self._payloads[position]) for position in heapq.nsmallest(limit, matches)]
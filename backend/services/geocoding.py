@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from db.pagination import iter_keyset_chunks
+from models import CityVenue, GeocodedAddress, User
+from services.cities import clean_city_text, normalize_city
+
+Point = tuple[float, float]
+
+_ABBREVIATIONS = {
+    "street": "st",
+    "avenue": "ave",
+    "boulevard": "blvd",
+    "drive": "dr",
+    "road": "rd",
+    "parkway": "pkwy",
+    "circle": "cir",
+    "lane": "ln",
+    "highway": "hwy",
+    "suite": "ste",
+    "north": "n",
+    "south": "s",
+    "east": "e",
+    "west": "w",
+}
+_COUNTRY_PARTS = {"us", "usa", "united states"}
+_STREET_NUMBER = re.compile(r"^\d+[a-z]?\s+")
+_QUERY_MAX_CHARS = 300
+_MEMORY_CACHE_SIZE = 4096
+
+
+def normalize_address(text: str | None) -> str:
+    """Cache key for an address or place name: lowercase, no periods, standard street abbreviations."""
+    if not text:
+        return ""
+    parts = []
+    for part in text.lower().replace(".", "").split(","):
+        words = [_ABBREVIATIONS.get(word, word) for word in part.split()]
+        if words:
+            parts.append(" ".join(words))
+    while parts and parts[-1] in _COUNTRY_PARTS:
+        parts.pop()
+    return ", ".join(parts)[:_QUERY_MAX_CHARS]
+
+
+class GeocodingProvider(ABC):
+    """Resolves normalized addresses to coordinates; subclasses set ``name`` and implement ``geocode_many``.
+
+    Providers are only asked about addresses missing from both caches, so a slow or metered
+    provider sees each address once. Stand-ins that only know a few places set
+    ``persist_misses = False`` so their misses never reach the shared table.
+    """
+
+    name = "base"
+    persist_misses = True
+
+    @abstractmethod
+    def geocode_many(self, queries: list[str], city: str) -> dict[str, Point | None]:
+        """Coordinates for each query, ``None`` for addresses the provider does not know."""
+
+
+# Known places in the pilot cities: (names, street address, coordinates).
+GAZETTEER: dict[str, list[tuple[tuple[str, ...], str, Point]]] = {
+    "austin": [
+        (("Mohawk Austin", "Mohawk"), "912 Red River St", (30.2697, -97.7361)),
+        (("ACL Live at The Moody Theater", "Moody Theater"), "310 W Willie Nelson Blvd", (30.2651, -97.7473)),
+        (("Stubb's Waller Creek Amphitheater", "Stubb's"), "801 Red River St", (30.2686, -97.7362)),
+        (("Emo's Austin", "Emo's"), "2015 E Riverside Dr", (30.2376, -97.7272)),
+        (("Scoot Inn",), "1308 E 4th St", (30.2616, -97.7276)),
+        (("Moody Center",), "2001 Robert Dedman Dr", (30.2818, -97.7322)),
+        (("Zilker Park",), "2100 Barton Springs Rd", (30.2669, -97.7729)),
+    ],
+    "san antonio": [
+        (("The Aztec Theatre", "Aztec Theatre"), "104 N St Mary's St", (29.4255, -98.4925)),
+        (("Tobin Center for the Performing Arts", "Tobin Center"), "100 Auditorium Cir", (29.4334, -98.4871)),
+        (("Paper Tiger",), "2410 N St Mary's St", (29.4452, -98.4926)),
+        (("Sam's Burger Joint",), "330 E Grayson St", (29.4413, -98.4800)),
+        (("Stable Hall",), "307 Pearl Pkwy", (29.4429, -98.4786)),
+        (("The Pearl", "Pearl"), "303 Pearl Pkwy", (29.4420, -98.4795)),
+        (("The Alamo", "Alamo"), "300 Alamo Plaza", (29.4260, -98.4861)),
+    ],
+}
+
+
+class GazetteerProvider(GeocodingProvider):
+    """Offline stand-in backed by a fixed list of known places; never leaves the process."""
+
+    name = "gazetteer"
+    persist_misses = False
+
+    def __init__(self, places: dict[str, list[tuple[tuple[str, ...], str, Point]]] | None = None) -> None:
+        self._index: dict[str, dict[str, Point]] = {}
+        for city, entries in (GAZETTEER if places is None else places).items():
+            index = self._index.setdefault(city, {})
+            for names, street, point in entries:
+                for key in (*names, street):
+                    index[normalize_address(key)] = point
+
+    def _candidates(self, query: str, city: str) -> list[str]:
+        head = query.split(",")[0].strip()
+        city_suffix = f" {clean_city_text(city)}"
+        keys = [query, head, _STREET_NUMBER.sub("", head), head.removesuffix(city_suffix).strip()]
+        return [key for key in dict.fromkeys(keys) if key]
+
+    def geocode_many(self, queries: list[str], city: str) -> dict[str, Point | None]:
+        index = self._index.get(city, {})
+        results: dict[str, Point | None] = {}
+        for query in queries:
+            results[query] = next((index[key] for key in self._candidates(query, city) if key in index), None)
+        return results
+
+
+GEOCODING_PROVIDERS: dict[str, Callable[[], GeocodingProvider]] = {
+    "gazetteer": GazetteerProvider,
+}
+
+
+@lru_cache(maxsize=1)
+def get_geocoding_provider() -> GeocodingProvider:
+    name = get_settings().geocoding_provider
+    if name not in GEOCODING_PROVIDERS:
+        raise ValueError(f"Unknown geocoding provider: {name}")
+    return GEOCODING_PROVIDERS[name]()
+
+
+_memory: OrderedDict[tuple[str, str], Point | None] = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _remember(city: str, results: dict[str, Point | None]) -> None:
+    with _memory_lock:
+        for query, point in results.items():
+            _memory[(city, query)] = point
+            _memory.move_to_end((city, query))
+        while len(_memory) > _MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def geocode_many(db: Session, texts: Iterable[str | None], city: str | None) -> dict[str, Point | None]:
+    """Coordinates for each address or place name in ``city`` (``None`` when unknown).
+
+    Lookups go process memory, then the ``geocoded_addresses`` table, then the provider, and
+    provider answers are written back so they are not asked again. A cached miss only counts
+    for the provider that recorded it and for ``geocoding_miss_ttl_seconds``, so switching
+    providers or waiting out the TTL re-asks. Cache rows join the caller's transaction.
+    """
+    city_key = normalize_city(city)
+    queries = {text: normalize_address(text) for text in texts if text}
+    wanted = {query for query in queries.values() if query}
+
+    found: dict[str, Point | None] = {}
+    with _memory_lock:
+        for query in wanted:
+            if (city_key, query) in _memory:
+                found[query] = _memory[(city_key, query)]
+                _memory.move_to_end((city_key, query))
+
+    missing = wanted - found.keys()
+    if missing:
+        provider = get_geocoding_provider()
+        misses_since = datetime.now(tz=timezone.utc) - timedelta(seconds=get_settings().geocoding_miss_ttl_seconds)
+        cached: dict[str, Point | None] = {}
+        rows = db.execute(
+            select(
+                GeocodedAddress.query,
+                GeocodedAddress.lat,
+                GeocodedAddress.lng,
+                GeocodedAddress.provider,
+                GeocodedAddress.created_at,
+            ).where(GeocodedAddress.city == city_key, GeocodedAddress.query.in_(missing))
+        ).all()
+        for query, lat, lng, recorded_by, recorded_at in rows:
+            if lat is not None and lng is not None:
+                cached[query] = (lat, lng)
+            elif recorded_by == provider.name and recorded_at > misses_since:
+                cached[query] = None
+        missing -= cached.keys()
+
+        if missing:
+            resolved = provider.geocode_many(sorted(missing), city_key)
+            rows_to_store = [
+                {
+                    "city": city_key,
+                    "query": query,
+                    "lat": resolved[query][0] if resolved.get(query) else None,
+                    "lng": resolved[query][1] if resolved.get(query) else None,
+                    "provider": provider.name,
+                }
+                for query in missing
+                if resolved.get(query) or provider.persist_misses
+            ]
+            if rows_to_store:
+                statement = pg_insert(GeocodedAddress).values(rows_to_store)
+                db.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=[GeocodedAddress.city, GeocodedAddress.query],
+                        set_={
+                            "lat": statement.excluded.lat,
+                            "lng": statement.excluded.lng,
+                            "provider": statement.excluded.provider,
+                            "created_at": func.now(),
+                        },
+                    )
+                )
+            cached.update({query: resolved.get(query) for query in missing})
+
+        _remember(city_key, cached)
+        found.update(cached)
+
+    return {text: found.get(query) for text, query in queries.items()}
+
+
+def _backfill(db: Session, model: Any, texts_for: Callable[[Any], list[str | None]]) -> int:
+    located = 0
+    statement = select(model).where(model.lat.is_(None))
+    for rows in iter_keyset_chunks(db, statement, model.id, key=lambda row: row.id):
+        by_city: dict[str, list[Any]] = {}
+        for row in rows:
+            by_city.setdefault(normalize_city(row.city), []).append(row)
+        for city, city_rows in by_city.items():
+            points = geocode_many(db, [text for row in city_rows for text in texts_for(row)], city)
+            for row in city_rows:
+                point = next((points[text] for text in texts_for(row) if text and points.get(text)), None)
+                if point:
+                    row.lat, row.lng = point
+                    located += 1
+    return located
+
+
+def backfill_coordinates(db: Session) -> dict[str, int]:
+    """Geocode users and venues that have no coordinates yet, one keyset chunk and city at a time."""
+    return {
+        "users": _backfill(db, User, lambda user: [user.address]),
+        "venues": _backfill(db, CityVenue, lambda venue: [venue.venue_name, venue.address]),
+    }
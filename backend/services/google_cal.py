@@ -2,8 +2,6 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
 
-import httpx
-
 
 def get_calendar_availability(access_token: str) -> list[dict]:
     now = datetime.now(tz=timezone.utc)
@@ -15,6 +13,8 @@ def get_calendar_availability(access_token: str) -> list[dict]:
     }
 
     headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "application/json"}
+    import httpx
+
     with httpx.Client(timeout=15) as client:
         response = client.post("https://www.googleapis.com/calendar/v3/freeBusy", headers=headers, json=payload)
         if response.status_code >= 400:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import re
 from collections import Counter
+from datetime import datetime, timezone
 from typing import Iterable
 from uuid import UUID
 
@@ -11,6 +12,7 @@ from sqlalchemy.orm import Session
 
 from models import HobbyCityPair, HobbyTag, User, UserHobby
 from services.ai import openrouter_client
+from services.cities import normalize_city
 
 _WORD_SPLIT = re.compile(r"[,;\n]+")
 
@@ -53,7 +55,7 @@ def _get_or_create_hobby_tag(db: Session, tag_name: str) -> HobbyTag:
 
 
 def upsert_hobby_city_pairs(db: Session, city: str, tags: Iterable[str]) -> None:
-    city_normalized = city.strip().lower()
+    city_normalized = normalize_city(city)
     counts = Counter(tags)
     for tag_name, count in counts.items():
         hobby_tag = _get_or_create_hobby_tag(db, tag_name)
@@ -79,6 +81,7 @@ def parse_and_store_user_hobbies(db: Session, user_id: UUID) -> list[str]:
 
     tags = parse_hobby_tags(latest_hobbies.raw_text)
     latest_hobbies.parsed_tags = tags
+    user.hobbies_parsed_at = datetime.now(tz=timezone.utc)
     upsert_hobby_city_pairs(db, user.city, tags)
     db.commit()
     return tags
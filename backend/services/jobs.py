@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+from uuid import UUID
+
+from sqlalchemy import and_, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from db.session import PipelineSessionLocal
+from models import Job
+from services.cities import normalize_city
+from services.events import refresh_pair_events
+from services.onboarding_email import send_onboarding_email
+from services.venues import discover_major_music_venues
+
+JobHandler = Callable[[Session, dict[str, Any]], Any]
+
+
+def _send_onboarding_email(db: Session, payload: dict[str, Any]) -> None:
+    send_onboarding_email(payload["name"], payload["email"], payload["onboarding_token"])
+
+
+def _discover_city_venues(db: Session, payload: dict[str, Any]) -> None:
+    discover_major_music_venues(db, city=payload["city"])
+
+
+def _refresh_pair_events(db: Session, payload: dict[str, Any]) -> None:
+    refresh_pair_events(db, UUID(payload["pair_id"]))
+
+
+JOB_HANDLERS: dict[str, JobHandler] = {
+    "send_onboarding_email": _send_onboarding_email,
+    "discover_city_venues": _discover_city_venues,
+    "refresh_pair_events": _refresh_pair_events,
+}
+
+
+def uses_job_table() -> bool:
+    """Development runs background work in-process; deployed environments use the jobs table."""
+    return get_settings().environment != "development"
+
+
+def onboarding_jobs(name: str, email: str, onboarding_token: str, city: str) -> list[tuple[str, dict[str, Any], str | None]]:
+    """(kind, payload, dedupe key) for the follow-up work a signup triggers."""
+    return [
+        ("send_onboarding_email", {"name": name, "email": email, "onboarding_token": onboarding_token}, None),
+        ("discover_city_venues", {"city": city}, f"discover_city_venues:{normalize_city(city)}"),
+    ]
+
+
+def enqueue_job(
+    db: Session,
+    kind: str,
+    payload: dict[str, Any],
+    dedupe_key: str | None = None,
+    run_after: datetime | None = None,
+) -> None:
+    """Queue a job in the caller's transaction, so it only exists if the caller commits.
+
+    A job whose ``dedupe_key`` matches one that is already queued or running is dropped.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    values: dict[str, Any] = {"kind": kind, "payload": payload, "dedupe_key": dedupe_key}
+    if run_after is not None:
+        values["run_after"] = run_after
+    statement = pg_insert(Job).values(**values)
+    if dedupe_key is not None:
+        statement = statement.on_conflict_do_nothing(
+            index_elements=[Job.dedupe_key],
+            # Literal predicate: a bound parameter here can't be matched to the partial index.
+            index_where=text("status IN ('queued', 'running')"),
+        )
+    db.execute(statement)
+
+
+def run_job_inline(kind: str, payload: dict[str, Any]) -> None:
+    """Run a job right away in its own session; used by FastAPI background tasks in development."""
+    with PipelineSessionLocal() as db:
+        try:
+            JOB_HANDLERS[kind](db, payload)
+            db.commit()
+        except Exception:
+            db.rollback()
+
+
+def claim_jobs(db: Session, limit: int | None = None) -> list[Job]:
+    """Lock a batch of due jobs for this worker.
+
+    ``FOR UPDATE SKIP LOCKED`` lets concurrent workers claim disjoint batches without waiting
+    on each other. Jobs stuck in ``running`` past the stale timeout (a worker died mid-job)
+    are claimed again.
+    """
+    settings = get_settings()
+    now = datetime.now(tz=timezone.utc)
+    stale_before = now - timedelta(seconds=settings.job_stale_after_seconds)
+    jobs = db.scalars(
+        select(Job)
+        .where(
+            Job.run_after <= now,
+            or_(Job.status == "queued", and_(Job.status == "running", Job.locked_at < stale_before)),
+        )
+        .order_by(Job.run_after.asc())
+        .limit(limit or settings.job_batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    for job in jobs:
+        job.status = "running"
+        job.locked_at = now
+        job.attempts += 1
+    db.commit()
+    return list(jobs)
+
+
+def _finish_job(db: Session, job: Job, error: Exception | None) -> str:
+    settings = get_settings()
+    now = datetime.now(tz=timezone.utc)
+    if error is None:
+        values: dict[str, Any] = {"status": "done", "finished_at": now, "last_error": None}
+    elif job.attempts < settings.job_max_attempts:
+        backoff = timedelta(seconds=30 * 2 ** (job.attempts - 1))
+        values = {"status": "queued", "run_after": now + backoff, "locked_at": None, "last_error": str(error)}
+    else:
+        values = {"status": "failed", "finished_at": now, "last_error": str(error)}
+    db.execute(update(Job).where(Job.id == job.id).values(**values))
+    db.commit()
+    return values["status"]
+
+
+def run_pending_jobs(db: Session, limit: int | None = None) -> dict[str, Any]:
+    claimed = claim_jobs(db, limit=limit)
+    summary: dict[str, Any] = {"claimed": len(claimed), "done": 0, "retried": 0, "failed": 0}
+    errors: list[str] = []
+    for job in claimed:
+        error = None
+        try:
+            JOB_HANDLERS[job.kind](db, job.payload)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = e
+            errors.append(f"{job.kind}[{job.id}]: {str(e)}")
+        status = _finish_job(db, job, error)
+        summary["retried" if status == "queued" else status] += 1
+    if errors:
+        summary["errors"] = errors
+    return summary
@@ -1,8 +1,6 @@
 """Welcome / onboarding email sent immediately after signup."""
 from __future__ import annotations
 
-import httpx
-
 from core.config import get_settings
 
 
@@ -63,6 +61,8 @@ def send_onboarding_email(name: str, email: str, onboarding_token: str) -> None:
 
     html = _render_onboarding_html(name, onboarding_token)
 
+    import httpx
+
     with httpx.Client(timeout=20) as client:
         client.post(
             "https://api.resend.com/emails",
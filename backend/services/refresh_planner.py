@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from core.config import get_settings
+from models import CityVenue, HobbyCityPair, HobbyTag, User, UserHobby
+from services.change_tracking import PAIR_REFRESH, VENUE_EVENTS_REFRESH, RefreshPolicy
+from services.cities import CityRegistry, get_city_registry
+
+_NEVER_SEARCHED_STALENESS = 2.0
+
+
+@dataclass
+class RefreshItem:
+    kind: str
+    id: UUID
+    city: str
+    label: str
+    users: int
+    staleness: float
+    urgency: float
+
+    @property
+    def score(self) -> float:
+        return self.users * self.staleness * self.urgency
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "id": str(self.id),
+            "city": self.city,
+            "label": self.label,
+            "users": self.users,
+            "staleness": round(self.staleness, 2),
+            "urgency": round(self.urgency, 2),
+            "score": round(self.score, 2),
+        }
+
+
+@dataclass
+class RefreshPlan:
+    budget: int
+    items: list[RefreshItem] = field(default_factory=list)
+    estimated_calls: int = 0
+    deferred: int = 0
+
+    def ids(self, kind: str) -> list[UUID]:
+        return [item.id for item in self.items if item.kind == kind]
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "budget": self.budget,
+            "estimated_calls": self.estimated_calls,
+            "planned": len(self.items),
+            "deferred": self.deferred,
+            "items": [item.as_dict() for item in self.items],
+        }
+
+
+def next_send_at(timezone_name: str, now: datetime) -> datetime:
+    """Next newsletter send slot (``newsletter_send_weekday`` at ``newsletter_send_hour``, city-local)."""
+    settings = get_settings()
+    local_now = now.astimezone(ZoneInfo(timezone_name))
+    days_ahead = (settings.newsletter_send_weekday - local_now.weekday()) % 7
+    send_at = local_now.replace(hour=settings.newsletter_send_hour, minute=0, second=0, microsecond=0)
+    send_at += timedelta(days=days_ahead)
+    if send_at <= local_now:
+        send_at += timedelta(days=7)
+    return send_at.astimezone(timezone.utc)
+
+
+def _staleness(
+    policy: RefreshPolicy, next_refresh_at: datetime | None, interval_seconds: int | None, empty: bool, send_at: datetime
+) -> float | None:
+    """How overdue a result set will be at the next send, in refresh intervals; ``None`` if still fresh then."""
+    if next_refresh_at is None or empty:
+        return _NEVER_SEARCHED_STALENESS
+    if next_refresh_at > send_at:
+        return None
+    interval = interval_seconds or policy.initial.total_seconds()
+    return 1 + (send_at - next_refresh_at).total_seconds() / interval
+
+
+def _urgency(send_at: datetime, now: datetime) -> float:
+    # A send later today weighs 7x one a week out.
+    days_until_send = max((send_at - now).total_seconds() / 86400, 0.0)
+    return 7 / (days_until_send + 1)
+
+
+def _subscribers_by_city(db: Session, registry: CityRegistry) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    rows = db.execute(select(User.city, func.count()).where(User.is_subscribed.is_(True)).group_by(User.city)).all()
+    for raw_city, count in rows:
+        key = registry.canonical(raw_city)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def _subscribers_by_city_tag(db: Session, registry: CityRegistry) -> dict[tuple[str, str], int]:
+    # Only each user's latest hobbies count, as in drafting; older entries are superseded.
+    latest_hobbies = (
+        select(UserHobby.user_id, UserHobby.parsed_tags)
+        .distinct(UserHobby.user_id)
+        .order_by(UserHobby.user_id, UserHobby.created_at.desc())
+        .subquery()
+    )
+    tags = (
+        select(
+            User.city.label("city"),
+            User.id.label("user_id"),
+            func.jsonb_array_elements_text(latest_hobbies.c.parsed_tags).label("tag"),
+        )
+        .join(latest_hobbies, latest_hobbies.c.user_id == User.id)
+        .where(User.is_subscribed.is_(True))
+        .subquery()
+    )
+    rows = db.execute(
+        select(tags.c.city, tags.c.tag, func.count(func.distinct(tags.c.user_id))).group_by(tags.c.city, tags.c.tag)
+    ).all()
+    counts: dict[tuple[str, str], int] = {}
+    for raw_city, tag, count in rows:
+        key = (registry.canonical(raw_city), tag)
+        counts[key] = counts.get(key, 0) + count
+    return counts
+
+
+def _pair_candidates(
+    db: Session,
+    registry: CityRegistry,
+    now: datetime,
+    send_times: dict[str, datetime],
+    cities: Collection[str] | None,
+    due_only: bool,
+) -> list[RefreshItem]:
+    subscribers = _subscribers_by_city_tag(db, registry)
+    horizon = now if due_only else now + timedelta(days=7)
+    query = (
+        select(
+            HobbyCityPair.id,
+            HobbyCityPair.city,
+            HobbyTag.tag_name,
+            HobbyCityPair.next_refresh_at,
+            HobbyCityPair.refresh_interval_seconds,
+            func.jsonb_array_length(HobbyCityPair.cached_results) == 0,
+        )
+        .join(HobbyTag, HobbyTag.id == HobbyCityPair.hobby_tag_id)
+        .where(
+            or_(
+                HobbyCityPair.next_refresh_at.is_(None),
+                HobbyCityPair.next_refresh_at <= horizon,
+                func.jsonb_array_length(HobbyCityPair.cached_results) == 0,
+            )
+        )
+    )
+    if cities is not None:
+        query = query.where(HobbyCityPair.city.in_(cities))
+
+    items: list[RefreshItem] = []
+    for pair_id, city, tag_name, next_refresh_at, interval_seconds, empty in db.execute(query).all():
+        users = subscribers.get((city, tag_name), 0)
+        if not users:
+            continue
+        send_at = send_times.setdefault(city, next_send_at(registry.timezone(city), now))
+        staleness = _staleness(PAIR_REFRESH, next_refresh_at, interval_seconds, empty, send_at)
+        if staleness is None:
+            continue
+        items.append(RefreshItem("pair", pair_id, city, tag_name, users, staleness, _urgency(send_at, now)))
+    return items
+
+
+def _venue_candidates(
+    db: Session,
+    registry: CityRegistry,
+    now: datetime,
+    send_times: dict[str, datetime],
+    cities: Collection[str] | None,
+    due_only: bool,
+) -> list[RefreshItem]:
+    pilot_cities = registry.pilot_slugs()
+    if cities is not None:
+        pilot_cities = [city for city in pilot_cities if city in cities]
+    if not pilot_cities:
+        return []
+
+    subscribers = _subscribers_by_city(db, registry)
+    rows = db.execute(
+        select(
+            CityVenue.id,
+            CityVenue.city,
+            CityVenue.venue_name,
+            CityVenue.next_refresh_at,
+            CityVenue.refresh_interval_seconds,
+            func.jsonb_array_length(CityVenue.cached_events) == 0,
+        ).where(CityVenue.city.in_(pilot_cities), CityVenue.venue_type == "music")
+    ).all()
+
+    items: list[RefreshItem] = []
+    for venue_id, city, venue_name, next_refresh_at, interval_seconds, empty in rows:
+        users = subscribers.get(city, 0)
+        if not users or (due_only and next_refresh_at is not None and next_refresh_at > now and not empty):
+            continue
+        send_at = send_times.setdefault(city, next_send_at(registry.timezone(city), now))
+        staleness = _staleness(VENUE_EVENTS_REFRESH, next_refresh_at, interval_seconds, empty, send_at)
+        if staleness is None:
+            continue
+        items.append(RefreshItem("venue", venue_id, city, venue_name, users, staleness, _urgency(send_at, now)))
+    return items
+
+
+def plan_refresh(
+    db: Session,
+    budget: int,
+    cities: Collection[str] | None = None,
+    include_venues: bool = True,
+    now: datetime | None = None,
+    due_only: bool = False,
+) -> RefreshPlan:
+    """Order pair and venue searches by users affected x staleness at next send x send urgency.
+
+    Items are taken greedily by score until ``budget`` LLM calls are spent. A pair costs one
+    call; venues share batched calls, so a venue only costs a call when it opens a new batch
+    for its city. Items nobody subscribed would see, or that stay fresh past their city's next
+    send, are left out; ``due_only`` also leaves out items whose refresh is not due yet.
+    """
+    now = now or datetime.now(tz=timezone.utc)
+    registry = get_city_registry(db)
+    send_times: dict[str, datetime] = {}
+    candidates = _pair_candidates(db, registry, now, send_times, cities, due_only)
+    if include_venues:
+        candidates.extend(_venue_candidates(db, registry, now, send_times, cities, due_only))
+    candidates.sort(key=lambda item: item.score, reverse=True)
+
+    batch_size = get_settings().venue_event_batch_size
+    plan = RefreshPlan(budget=budget)
+    venues_per_city: dict[str, int] = {}
+    for item in candidates:
+        if item.kind == "venue":
+            cost = 1 if venues_per_city.get(item.city, 0) % batch_size == 0 else 0
+        else:
+            cost = 1
+        if plan.estimated_calls + cost > budget:
+            plan.deferred += 1
+            continue
+        plan.items.append(item)
+        plan.estimated_calls += cost
+        if item.kind == "venue":
+            venues_per_city[item.city] = venues_per_city.get(item.city, 0) + 1
+    return plan
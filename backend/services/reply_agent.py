@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import re
 from dataclasses import dataclass
@@ -7,10 +8,13 @@ from typing import Any
 from uuid import UUID
 
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from db.session import PipelineSessionLocal
 from models import Newsletter, NewsletterFeedback, User, UserGoal, UserHobby
 from services.ai import openrouter_client
+from services.change_tracking import mark_user_changed
 from services.hobbies import parse_and_store_user_hobbies
 
 UUID_RE = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}")
@@ -194,11 +198,15 @@ def _apply_add_interests(db: Session, user: User, interests: list[str]) -> int:
     merged_raw = f"{existing_raw}\nAlso interested in: {additions}".strip()
 
     db.add(UserHobby(user_id=user.id, raw_text=merged_raw, parsed_tags=[]))
-    db.flush()
-    parse_and_store_user_hobbies(db, user.id)
+    mark_user_changed(db, user.id, hobbies=True)
     return len(interests)
 
 
+def _reparse_user_hobbies(user_id: UUID) -> None:
+    with PipelineSessionLocal() as db:
+        parse_and_store_user_hobbies(db, user_id)
+
+
 def _apply_remove_interests(db: Session, user: User, interests: list[str]) -> int:
     if not interests:
         return 0
@@ -210,49 +218,42 @@ def _apply_remove_interests(db: Session, user: User, interests: list[str]) -> in
             goal_types=["avoid", "content_filter"],
         )
     )
+    mark_user_changed(db, user.id, context=True)
     return len(interests)
 
 
-def _resolve_user_and_newsletter(
-    db: Session,
+async def _resolve_user_and_newsletter(
+    db: AsyncSession,
     sender_email: str,
     recipients: list[str],
 ) -> tuple[User | None, Newsletter | None]:
     newsletter = None
     newsletter_id = _extract_newsletter_id_from_recipients(recipients)
     if newsletter_id:
-        newsletter = db.get(Newsletter, newsletter_id)
+        newsletter = await db.get(Newsletter, newsletter_id)
     if newsletter:
-        user = db.get(User, newsletter.user_id)
+        user = await db.get(User, newsletter.user_id)
         return user, newsletter
 
-    user = db.scalar(select(User).where(User.email == sender_email.lower()))
+    user = await db.scalar(select(User).where(User.email == sender_email.lower()))
     if not user:
         return None, None
 
-    latest_newsletter = db.scalars(
-        select(Newsletter).where(Newsletter.user_id == user.id).order_by(Newsletter.created_at.desc())
+    latest_newsletter = (
+        await db.scalars(
+            select(Newsletter).where(Newsletter.user_id == user.id).order_by(Newsletter.created_at.desc())
+        )
     ).first()
     return user, latest_newsletter
 
 
-def process_inbound_reply_payload(db: Session, payload: dict[str, Any]) -> dict[str, Any]:
-    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
-    sender_email = _extract_sender_email(str(data.get("from", "")))
-    recipients = _extract_recipient_candidates(payload)
-    raw_reply = _extract_reply_text(payload)
-
-    user, newsletter = _resolve_user_and_newsletter(db, sender_email=sender_email, recipients=recipients)
-    reply_result = classify_and_rewrite_reply(raw_reply, newsletter=newsletter, user=user)
-
-    if not user:
-        return {
-            "processed": False,
-            "detail": "No matching user found for inbound reply.",
-            "sender_email": sender_email,
-            "intent": reply_result.intent,
-        }
-
+def _apply_reply_result(
+    db: Session,
+    user: User,
+    newsletter: Newsletter | None,
+    raw_reply: str,
+    reply_result: ReplyAgentResult,
+) -> dict[str, Any]:
     updates_applied = {"added_interests": 0, "removed_interests": 0, "unsubscribed": False, "feedback_saved": False}
 
     if reply_result.intent == "unsubscribe":
@@ -275,9 +276,42 @@ def process_inbound_reply_payload(db: Session, payload: dict[str, Any]) -> dict[
                 feedback_type=reply_result.feedback_type,
             )
         )
+        mark_user_changed(db, user.id, context=True)
         updates_applied["feedback_saved"] = True
+    return updates_applied
+
+
+async def process_inbound_reply_payload(db: AsyncSession, payload: dict[str, Any]) -> dict[str, Any]:
+    """Classify an inbound reply and apply it to the sender's profile.
+
+    Lookups and writes go through the async session; the LLM calls run in worker threads so
+    they never block the event loop.
+    """
+    data = payload.get("data") if isinstance(payload.get("data"), dict) else payload
+    sender_email = _extract_sender_email(str(data.get("from", "")))
+    recipients = _extract_recipient_candidates(payload)
+    raw_reply = _extract_reply_text(payload)
+
+    user, newsletter = await _resolve_user_and_newsletter(db, sender_email=sender_email, recipients=recipients)
+    reply_result = await asyncio.to_thread(classify_and_rewrite_reply, raw_reply, newsletter=newsletter, user=user)
+
+    if not user:
+        return {
+            "processed": False,
+            "detail": "No matching user found for inbound reply.",
+            "sender_email": sender_email,
+            "intent": reply_result.intent,
+        }
+
+    updates_applied = await db.run_sync(_apply_reply_result, user, newsletter, raw_reply, reply_result)
+    await db.commit()
+
+    if updates_applied["added_interests"]:
+        try:
+            await asyncio.to_thread(_reparse_user_hobbies, user.id)
+        except Exception:
+            pass  # hobbies_changed_at is set, so the next incremental run parses them
 
-    db.commit()
     return {
         "processed": True,
         "user_id": str(user.id),
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import httpx
-
 
 def get_recent_tracks(access_token: str) -> list[dict]:
     headers = {"Authorization": f"Bearer {access_token}"}
     params = {"limit": 10}
+    import httpx
+
     with httpx.Client(timeout=15) as client:
         response = client.get("https://api.spotify.com/v1/me/player/recently-played", headers=headers, params=params)
         if response.status_code >= 400:
@@ -2,14 +2,15 @@ from __future__ import annotations
 
 import base64
 import hashlib
-
-from cryptography.fernet import Fernet
+from functools import lru_cache
 
 from core.config import get_settings
 
 
 class TokenCipher:
     def __init__(self) -> None:
+        from cryptography.fernet import Fernet
+
         settings = get_settings()
         secret_material = settings.token_encryption_key or settings.session_secret
         digest = hashlib.sha256(secret_material.encode("utf-8")).digest()
@@ -23,4 +24,7 @@ class TokenCipher:
         return self._fernet.decrypt(value.encode("utf-8")).decode("utf-8")
 
 
-cipher = TokenCipher()
+@lru_cache(maxsize=1)
+def get_cipher() -> TokenCipher:
+    """Build the cipher on first use; cryptography is too heavy to load on every cold start."""
+    return TokenCipher()
@@ -1,27 +1,29 @@
 from __future__ import annotations
 
+import contextvars
 import json
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import Float, Text, and_, cast, column, func, literal, select, text, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from models import CityVenue
+from core.config import get_settings
+from models import City, CityVenue
 from services.ai import openrouter_client
-
-PILOT_CITIES = ("austin", "san antonio")
-
-
-def normalize_city(value: str) -> str:
-    normalized = " ".join(value.strip().lower().replace(".", "").split())
-    if "," in normalized:
-        normalized = normalized.split(",", 1)[0].strip()
-    for suffix in (", tx", ", texas", " tx", " texas"):
-        if normalized.endswith(suffix):
-            normalized = normalized[: -len(suffix)].strip()
-            break
-    return normalized
+from services.change_tracking import (
+    VENUE_DISCOVERY_REFRESH,
+    VENUE_EVENTS_REFRESH,
+    fingerprint_venues,
+    record_event_results,
+    schedule_refresh,
+)
+from services.cities import get_city_registry, normalize_city
+from services.event_dates import annotate_event_dates
+from services.event_store import invalidate_event_index, replace_source_events
+from services.geocoding import geocode_many
 
 
 def _fallback_venues(city: str) -> list[dict[str, str]]:
@@ -75,22 +77,105 @@ def _parse_json_list(payload: str) -> list[dict[str, Any]]:
     return cleaned
 
 
+def upsert_city_venues(db: Session, city: str, venues: list[dict[str, Any]], now: datetime) -> int:
+    """Insert or update a city's discovered music venues in one statement.
+
+    Names match existing rows case-insensitively in SQL (a match keeps the stored spelling),
+    and the upsert rides ``uq_city_venues_city_name``, so concurrent discoveries of the same
+    city update each other's rows instead of failing. The caller owns the transaction.
+    """
+    by_name: dict[str, dict[str, Any]] = {}
+    for venue_data in venues:
+        venue_name = str(venue_data.get("venue_name", "")).strip()
+        if venue_name:
+            # One row per name: ON CONFLICT can't touch the same row twice in a statement.
+            by_name.setdefault(venue_name.lower(), {**venue_data, "venue_name": venue_name})
+    if not by_name:
+        return 0
+
+    points = geocode_many(
+        db, [text for venue_data in by_name.values() for text in (venue_data["venue_name"], venue_data.get("address"))], city
+    )
+    rows = []
+    for venue_data in by_name.values():
+        point = points.get(venue_data["venue_name"]) or points.get(venue_data.get("address"))
+        rows.append(
+            (
+                venue_data["venue_name"],
+                venue_data.get("address"),
+                venue_data.get("website"),
+                point[0] if point else None,
+                point[1] if point else None,
+            )
+        )
+
+    incoming = values(
+        column("venue_name", Text),
+        column("address", Text),
+        column("website", Text),
+        column("lat", Float),
+        column("lng", Float),
+        name="incoming",
+    ).data(rows)
+    existing = CityVenue.__table__.alias("existing")
+    source = select(
+        func.gen_random_uuid(),
+        literal(city),
+        func.coalesce(existing.c.venue_name, incoming.c.venue_name),
+        literal("music"),
+        incoming.c.address,
+        incoming.c.website,
+        # An all-NULL VALUES column is typed text, so the coordinates need an explicit cast.
+        cast(incoming.c.lat, Float),
+        cast(incoming.c.lng, Float),
+        literal(now),
+        func.jsonb_build_array(),
+    ).select_from(
+        incoming.outerjoin(
+            existing, and_(existing.c.city == city, func.lower(existing.c.venue_name) == func.lower(incoming.c.venue_name))
+        )
+    )
+    statement = pg_insert(CityVenue).from_select(
+        ["id", "city", "venue_name", "venue_type", "address", "website", "lat", "lng", "last_searched", "cached_events"],
+        source,
+    )
+    statement = statement.on_conflict_do_update(
+        constraint="uq_city_venues_city_name",
+        set_={
+            "address": statement.excluded.address,
+            "website": statement.excluded.website,
+            "lat": func.coalesce(statement.excluded.lat, CityVenue.lat),
+            "lng": func.coalesce(statement.excluded.lng, CityVenue.lng),
+            "last_searched": statement.excluded.last_searched,
+        },
+    )
+    return db.execute(statement).rowcount
+
+
 def discover_major_music_venues(db: Session, city: str, force_refresh: bool = False) -> int:
-    normalized_city = normalize_city(city)
-    if normalized_city not in PILOT_CITIES:
+    registry = get_city_registry()
+    normalized_city = registry.canonical(city)
+    if not registry.is_pilot(normalized_city):
         return 0
 
     now = datetime.now(tz=timezone.utc)
-    existing = db.scalars(select(CityVenue).where(CityVenue.city == normalized_city, CityVenue.venue_type == "music")).all()
-    if existing and not force_refresh:
-        newest_search = max((venue.last_searched for venue in existing if venue.last_searched), default=None)
-        if newest_search and newest_search > now - timedelta(days=30):
+    venue_count, newest_search = db.execute(
+        select(func.count(), func.max(CityVenue.last_searched)).where(
+            CityVenue.city == normalized_city, CityVenue.venue_type == "music"
+        )
+    ).one()
+    city_row = db.scalar(select(City).where(City.slug == normalized_city))
+    if venue_count and not force_refresh:
+        next_discovery = city_row.next_venue_discovery_at if city_row is not None else None
+        if next_discovery is None and newest_search:
+            next_discovery = newest_search + VENUE_DISCOVERY_REFRESH.initial
+        if next_discovery and next_discovery > now:
             return 0
 
     try:
         result = openrouter_client.chat(
             prompt=(
-                f"List major live music venues in {normalized_city.title()}, Texas.\n"
+                f"List major live music venues in {registry.label(normalized_city)}.\n"
                 "Return strict JSON array of objects with keys: venue_name, address, website.\n"
                 "Keep only established venues with frequent live shows."
             ),
@@ -103,33 +188,18 @@ def discover_major_music_venues(db: Session, city: str, force_refresh: bool = Fa
     if not parsed_venues:
         parsed_venues = _fallback_venues(normalized_city)
 
-    existing_by_name = {venue.venue_name.strip().lower(): venue for venue in existing}
-    touched = 0
-    for venue_data in parsed_venues:
-        venue_name = str(venue_data.get("venue_name", "")).strip()
-        if not venue_name:
-            continue
-        key = venue_name.lower()
-        existing_row = existing_by_name.get(key)
-        if existing_row:
-            existing_row.address = venue_data.get("address")
-            existing_row.website = venue_data.get("website")
-            existing_row.last_searched = now
-            touched += 1
-            continue
+    touched = upsert_city_venues(db, normalized_city, parsed_venues, now)
 
-        db.add(
-            CityVenue(
-                city=normalized_city,
-                venue_name=venue_name,
-                venue_type="music",
-                address=venue_data.get("address"),
-                website=venue_data.get("website"),
-                last_searched=now,
-                cached_events=[],
-            )
+    if city_row is not None:
+        fingerprint = fingerprint_venues(parsed_venues)
+        city_row.venue_refresh_interval_seconds, city_row.next_venue_discovery_at = schedule_refresh(
+            VENUE_DISCOVERY_REFRESH,
+            city_row.venue_refresh_interval_seconds,
+            city_row.venues_fingerprint,
+            fingerprint,
+            now,
         )
-        touched += 1
+        city_row.venues_fingerprint = fingerprint
 
     db.commit()
     return touched
@@ -137,7 +207,7 @@ def discover_major_music_venues(db: Session, city: str, force_refresh: bool = Fa
 
 def discover_pilot_city_venues(db: Session, force_refresh: bool = False) -> int:
     total = 0
-    for city in PILOT_CITIES:
+    for city in get_city_registry().pilot_slugs():
         total += discover_major_music_venues(db, city=city, force_refresh=force_refresh)
     return total
 
@@ -184,12 +254,79 @@ def _parse_events(payload: str, city: str, venue_name: str) -> list[dict[str, st
                 "category": str(item.get("category", "")).strip() or "Music",
             }
         )
-    return events
+    return annotate_event_dates(events, city)
+
+
+def _parse_batch_events(payload: str, city: str, venues: list[tuple[str, str]]) -> dict[str, list[dict[str, str]]]:
+    """Events per venue id from a batched reply; venues missing or empty in the reply are left out."""
+    if not payload:
+        return {}
+    try:
+        parsed = json.loads(payload)
+    except json.JSONDecodeError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    events_by_venue: dict[str, list[dict[str, str]]] = {}
+    for venue_id, venue_name in venues:
+        items = parsed.get(venue_id)
+        if not isinstance(items, list):
+            continue
+        events = _parse_events(json.dumps(items), city, venue_name)
+        if events:
+            events_by_venue[venue_id] = events
+    return events_by_venue
+
+
+def _search_single_venue(venue_name: str, city: str, city_label: str) -> list[dict[str, str]]:
+    try:
+        result = openrouter_client.chat(
+            prompt=(
+                f"List upcoming events at {venue_name} in {city_label} for the next 14 days.\n"
+                "Return strict JSON array with keys: name, date, location, price, why, url, category.\n"
+                "If exact data is uncertain, still return best known likely events with concise notes."
+            ),
+            system_prompt="Return strict JSON only.",
+        )
+        return _parse_events(result, city, venue_name)
+    except Exception:
+        return []
+
+
+def _search_venue_batch(venues: list[tuple[str, str]], city: str, city_label: str) -> dict[str, list[dict[str, str]]]:
+    """Ask for several venues' events in one request, then retry singly only the venues it missed.
+
+    ``venues`` is (venue id, venue name) pairs; runs on a worker thread, so it never touches the session.
+    """
+    events_by_venue: dict[str, list[dict[str, str]]] = {}
+    if len(venues) > 1:
+        venue_lines = "\n".join(f"- {venue_id}: {venue_name}" for venue_id, venue_name in venues)
+        try:
+            result = openrouter_client.chat(
+                prompt=(
+                    f"List upcoming events for the next 14 days at each of these venues in {city_label}:\n"
+                    f"{venue_lines}\n"
+                    "Return a strict JSON object keyed by the venue id shown before each venue name. Each value is "
+                    "an array of events with keys: name, date, location, price, why, url, category.\n"
+                    "If exact data is uncertain, still return best known likely events with concise notes."
+                ),
+                system_prompt="Return strict JSON only.",
+            )
+            events_by_venue = _parse_batch_events(result, city, venues)
+        except Exception:
+            events_by_venue = {}
+
+    for venue_id, venue_name in venues:
+        if venue_id not in events_by_venue:
+            events_by_venue[venue_id] = _search_single_venue(venue_name, city, city_label)
+    return events_by_venue
 
 
 def search_venue_events_for_city(db: Session, city: str, force_refresh: bool = False) -> int:
-    normalized_city = normalize_city(city)
-    if normalized_city not in PILOT_CITIES:
+    registry = get_city_registry()
+    normalized_city = registry.canonical(city)
+    if not registry.is_pilot(normalized_city):
         return 0
 
     venues = db.scalars(
@@ -204,37 +341,58 @@ def search_venue_events_for_city(db: Session, city: str, force_refresh: bool = F
         ).all()
 
     now = datetime.now(tz=timezone.utc)
-    processed = 0
-    for venue in venues:
-        if (
-            not force_refresh
-            and venue.last_events_searched
-            and venue.last_events_searched > now - timedelta(days=6)
-            and venue.cached_events
-        ):
-            continue
+    due = [
+        venue
+        for venue in venues
+        if force_refresh
+        or not venue.next_refresh_at
+        or venue.next_refresh_at <= now
+        or not venue.cached_events
+    ]
+    if not due:
+        return 0
 
-        try:
-            result = openrouter_client.chat(
-                prompt=(
-                    f"List upcoming events at {venue.venue_name} in {normalized_city.title()}, Texas for the next 14 days.\n"
-                    "Return strict JSON array with keys: name, date, location, price, why, url, category.\n"
-                    "If exact data is uncertain, still return best known likely events with concise notes."
-                ),
-                system_prompt="Return strict JSON only.",
-            )
-            parsed_events = _parse_events(result, normalized_city, venue.venue_name)
-        except Exception:
-            parsed_events = []
-        
-        if not parsed_events:
-            parsed_events = _fallback_venue_events(normalized_city, venue.venue_name)
+    # LLM calls dominate this stage: one request covers a batch of venues and batches run
+    # concurrently, so wall time follows the number of batches rather than venues.
+    settings = get_settings()
+    city_label = registry.label(normalized_city)
+    batch_size = settings.venue_event_batch_size
+    batches = [
+        [(str(venue.id), venue.venue_name) for venue in due[start : start + batch_size]]
+        for start in range(0, len(due), batch_size)
+    ]
+    events_by_venue: dict[str, list[dict[str, str]]] = {}
+    with ThreadPoolExecutor(max_workers=min(settings.venue_event_search_workers, len(batches))) as executor:
+        # Each worker runs in its own copy of the caller's context so query tracking follows it.
+        futures = [
+            executor.submit(contextvars.copy_context().run, _search_venue_batch, batch, normalized_city, city_label)
+            for batch in batches
+        ]
+        for future in futures:
+            events_by_venue.update(future.result())
 
-        venue.cached_events = parsed_events[:6]
+    processed = 0
+    for venue in due:
+        found_events = (events_by_venue.get(str(venue.id)) or [])[:6]
+        venue.cached_events = found_events or annotate_event_dates(
+            _fallback_venue_events(normalized_city, venue.venue_name), normalized_city, now=now
+        )
         venue.last_events_searched = now
+        # Placeholders are not results: scheduling on what the search actually found keeps a miss on a short retry.
+        record_event_results(venue, found_events, now, VENUE_EVENTS_REFRESH)
+        replace_source_events(
+            db,
+            city=normalized_city,
+            source="venue",
+            source_key=str(venue.id),
+            events=venue.cached_events,
+            now=now,
+            coordinates=(venue.lat, venue.lng) if venue.lat is not None and venue.lng is not None else None,
+        )
         processed += 1
 
     db.commit()
+    invalidate_event_index(normalized_city)
     return processed
 
 
@@ -243,28 +401,39 @@ def search_venue_events(db: Session, city: str | None = None, force_refresh: boo
         return search_venue_events_for_city(db, city=city, force_refresh=force_refresh)
 
     total = 0
-    for pilot_city in PILOT_CITIES:
+    for pilot_city in get_city_registry().pilot_slugs():
         total += search_venue_events_for_city(db, city=pilot_city, force_refresh=force_refresh)
     return total
 
 
+# The first few events of each venue, in venue-name order, with drafting defaults filled in.
+_CACHED_VENUE_EVENTS = text(
+    """
+    SELECT
+        event.value
+        || CASE WHEN coalesce(event.value->>'location', '') = ''
+                THEN jsonb_build_object('location', venue.venue_name || ', ' || :city_label)
+                ELSE '{}'::jsonb END
+        || CASE WHEN coalesce(event.value->>'category', '') = ''
+                THEN jsonb_build_object('category', 'Music')
+                ELSE '{}'::jsonb END
+    FROM city_venues AS venue
+    CROSS JOIN LATERAL jsonb_array_elements(venue.cached_events) WITH ORDINALITY AS event(value, event_index)
+    WHERE venue.city = :city
+      AND venue.venue_type = 'music'
+      AND event.event_index <= :per_venue
+      AND jsonb_typeof(event.value) = 'object'
+    ORDER BY venue.venue_name ASC, event.event_index ASC
+    LIMIT :limit
+    """
+)
+
+
 def get_cached_venue_events_for_city(db: Session, city: str, limit: int = 8) -> list[dict]:
+    """First events of each music venue's JSONB cache, for cities that have no indexed events yet."""
     normalized_city = normalize_city(city)
-    venues = db.scalars(
-        select(CityVenue).where(CityVenue.city == normalized_city, CityVenue.venue_type == "music").order_by(CityVenue.venue_name.asc())
+    events = db.scalars(
+        _CACHED_VENUE_EVENTS,
+        {"city": normalized_city, "city_label": normalized_city.title(), "per_venue": 3, "limit": limit},
     ).all()
-
-    events: list[dict] = []
-    for venue in venues:
-        for event in venue.cached_events[:3]:
-            if not isinstance(event, dict):
-                continue
-            enriched = dict(event)
-            if not enriched.get("location"):
-                enriched["location"] = f"{venue.venue_name}, {normalized_city.title()}"
-            if not enriched.get("category"):
-                enriched["category"] = "Music"
-            events.append(enriched)
-            if len(events) >= limit:
-                return events
-    return events
+    return [dict(event) for event in events]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from services.change_tracking import VENUE_EVENTS_REFRESH, record_event_results
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+EVENTS = [{"name": "Late Show", "date": "Fri 9pm", "location": "Mohawk"}]
+
+
+def _target(**values) -> SimpleNamespace:
+    defaults = {"results_fingerprint": None, "refresh_interval_seconds": None, "next_refresh_at": None, "events_changed_at": None}
+    return SimpleNamespace(**{**defaults, **values})
+
+
+def test_unchanged_results_stretch_the_interval():
+    target = _target()
+    assert record_event_results(target, EVENTS, NOW, VENUE_EVENTS_REFRESH) is True
+    assert target.next_refresh_at == NOW + VENUE_EVENTS_REFRESH.initial
+    assert record_event_results(target, EVENTS, NOW, VENUE_EVENTS_REFRESH) is False
+    assert target.next_refresh_at == NOW + VENUE_EVENTS_REFRESH.initial * VENUE_EVENTS_REFRESH.growth
+
+
+def test_empty_searches_retry_at_the_minimum_without_touching_the_fingerprint():
+    target = _target(refresh_interval_seconds=int(timedelta(days=12).total_seconds()))
+    record_event_results(target, EVENTS, NOW, VENUE_EVENTS_REFRESH)
+    fingerprint = target.results_fingerprint
+    for _ in range(3):
+        assert record_event_results(target, [], NOW, VENUE_EVENTS_REFRESH) is False
+        assert target.next_refresh_at == NOW + VENUE_EVENTS_REFRESH.minimum
+    assert target.results_fingerprint == fingerprint
+    assert target.events_changed_at == NOW
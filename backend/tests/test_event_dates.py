@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+import services.event_dates as event_dates
+from services.event_dates import _parse_cached, _parse_times, parse_event_date
+
+TZ = "America/Chicago"
+TODAY = date(2026, 10, 21)  # a Wednesday
+
+
+def _at(day: date, hour: int, minute: int = 0) -> datetime:
+    return datetime.combine(day, time(hour, minute), tzinfo=ZoneInfo(TZ))
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("8pm", [time(20)]),
+        ("7-10pm", [time(19), time(22)]),
+        ("8–11 pm", [time(20), time(23)]),
+        ("7:30 - 10:15 p.m.", [time(19, 30), time(22, 15)]),
+        ("11am to 2pm", [time(11), time(14)]),
+        ("11-2pm", [time(11), time(14)]),
+        ("10-1am", [time(22), time(1)]),
+        ("doors 7pm, show 8:30pm", [time(19), time(20, 30)]),
+        ("19:00-22:00", [time(19), time(22)]),
+        ("oct 24-26", []),
+        ("13pm", []),
+    ],
+)
+def test_parse_times(text, expected):
+    assert _parse_times(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "start", "end"),
+    [
+        ("Oct 24, 7-10pm", _at(date(2026, 10, 24), 19), _at(date(2026, 10, 24), 22)),
+        ("Sat 8–11 PM", _at(date(2026, 10, 24), 20), _at(date(2026, 10, 24), 23)),
+        ("Friday 10pm-2am", _at(date(2026, 10, 23), 22), _at(date(2026, 10, 24), 2)),
+        ("Oct 30, 9pm", _at(date(2026, 10, 30), 21), None),
+        ("10/31 11am-1pm", _at(date(2026, 10, 31), 11), _at(date(2026, 10, 31), 13)),
+    ],
+)
+def test_ranges_start_at_the_range_start(raw, start, end):
+    parsed, _bare_time = _parse_cached(raw, TZ, TODAY)
+    assert parsed.precision == "time"
+    assert (parsed.start, parsed.end) == (start, end)
+
+
+def test_day_without_time_spans_the_day():
+    parsed, _bare_time = _parse_cached("Oct 24", TZ, TODAY)
+    assert (parsed.start, parsed.end, parsed.precision) == (
+        _at(date(2026, 10, 24), 0),
+        _at(date(2026, 10, 24) + timedelta(days=1), 0),
+        "day",
+    )
+
+
+@pytest.mark.parametrize(
+    ("raw", "now_hour", "start", "end"),
+    [
+        ("8pm", 12, _at(TODAY, 20), None),
+        ("8pm", 21, _at(TODAY + timedelta(days=1), 20), None),
+        ("7-10pm", 21, _at(TODAY + timedelta(days=1), 19), _at(TODAY + timedelta(days=1), 22)),
+        ("tonight 8pm", 21, _at(TODAY, 20), None),
+    ],
+)
+def test_bare_times_mean_their_next_occurrence(monkeypatch, raw, now_hour, start, end):
+    monkeypatch.setattr(event_dates, "city_timezone", lambda city: TZ)
+    parsed = parse_event_date(raw, "austin", now=_at(TODAY, now_hour))
+    assert (parsed.start, parsed.end) == (start, end)
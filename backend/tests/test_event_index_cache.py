@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+import services.event_store as event_store
+from services.event_store import invalidate_event_index, load_event_geo_index
+
+
+class _Result:
+    def __init__(self, rows: list) -> None:
+        self.rows = rows
+
+    def one(self):
+        return self.rows[0]
+
+    def all(self) -> list:
+        return self.rows
+
+
+class _EventsSession:
+    """Answers the version aggregate and the events query from in-memory rows."""
+
+    def __init__(self) -> None:
+        self.version = (1, "2026-10-19T08:00:00+00:00")
+        self.rows = [({"name": "Late Show"}, 30.2697, -97.7361)]
+        self.event_queries = 0
+
+    def execute(self, statement):
+        if "count" in str(statement):
+            return _Result([self.version])
+        self.event_queries += 1
+        return _Result(list(self.rows))
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache(monkeypatch):
+    monkeypatch.setattr(event_store, "_event_index_cache", event_store._EventIndexCache())
+
+
+def test_index_is_shared_until_the_city_events_change():
+    db = _EventsSession()
+    first = load_event_geo_index(db, "austin")
+    assert load_event_geo_index(db, "austin") is first
+    assert db.event_queries == 1
+
+    db.version = (2, "2026-10-19T09:00:00+00:00")
+    db.rows.append(({"name": "Early Show"}, None, None))
+    rebuilt = load_event_geo_index(db, "austin")
+    assert rebuilt is not first and len(rebuilt) == 2
+    assert db.event_queries == 2
+
+
+def test_invalidation_and_ttl_force_a_rebuild(monkeypatch):
+    db = _EventsSession()
+    load_event_geo_index(db, "austin")
+    invalidate_event_index("austin")
+    load_event_geo_index(db, "austin")
+    assert db.event_queries == 2
+
+    monkeypatch.setattr(event_store.get_settings(), "event_index_ttl_seconds", 0)
+    load_event_geo_index(db, "austin")
+    assert db.event_queries == 3
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from services.geo import EventGeoIndex
+
+DOWNTOWN_AUSTIN = (30.2672, -97.7431)
+EVENTS = [
+    ({"name": "Mohawk"}, 30.2697, -97.7361),
+    ({"name": "Round Rock"}, 30.5083, -97.6789),
+    ({"name": "Undated venue"}, None, None),
+    ({"name": "Zilker Park"}, 30.2669, -97.7729),
+]
+
+
+def _names(events: list[dict]) -> list[str]:
+    return [event["name"] for event in events]
+
+
+def test_nearby_keeps_events_within_radius_in_drafting_order():
+    index = EventGeoIndex(EVENTS)
+    assert _names(index.nearby(*DOWNTOWN_AUSTIN, radius_miles=5, limit=12)) == ["Mohawk", "Undated venue", "Zilker Park"]
+    assert "Round Rock" in _names(index.nearby(*DOWNTOWN_AUSTIN, radius_miles=25, limit=12))
+
+
+def test_nearby_respects_limit_and_users_without_coordinates():
+    index = EventGeoIndex(EVENTS)
+    assert len(index) == 4
+    assert _names(index.nearby(*DOWNTOWN_AUSTIN, radius_miles=25, limit=2)) == ["Mohawk", "Round Rock"]
+    assert _names(index.nearby(None, None, radius_miles=1, limit=12)) == _names([payload for payload, _, _ in EVENTS])
+
+
+def test_empty_radius_is_empty_rather_than_city_wide():
+    index = EventGeoIndex([({"name": "Mohawk"}, 30.2697, -97.7361)])
+    assert index.nearby(29.4241, -98.4936, radius_miles=10, limit=12) == []
+    assert len(index) == 1
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import services.geocoding as geocoding
+from services.geocoding import GazetteerProvider, GeocodingProvider, normalize_address
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("912 Red River Street, Austin, TX, USA", "912 red river st, austin, tx"),
+        ("  Stubb's  Waller Creek  Amphitheater ", "stubb's waller creek amphitheater"),
+        ("104 N. St. Mary's St., United States", "104 n st mary's st"),
+        (None, ""),
+    ],
+)
+def test_normalize_address(text, expected):
+    assert normalize_address(text) == expected
+
+
+def test_gazetteer_matches_names_and_street_addresses():
+    provider = GazetteerProvider()
+    queries = [normalize_address(text) for text in ("Mohawk", "912 Red River Street, Austin", "Nowhere Bar")]
+    assert provider.geocode_many(queries, "austin") == {
+        queries[0]: (30.2697, -97.7361),
+        queries[1]: (30.2697, -97.7361),
+        queries[2]: None,
+    }
+    assert provider.geocode_many(queries[:1], "san antonio") == {queries[0]: None}
+
+
+def test_providers_must_implement_geocode_many():
+    class Incomplete(GeocodingProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+class _GeocodeSession:
+    """Returns canned cache rows and records what ``geocode_many`` writes back."""
+
+    def __init__(self, rows: list[tuple]) -> None:
+        self.rows = rows
+        self.inserted: list[dict] = []
+
+    def execute(self, statement):
+        if getattr(statement, "is_insert", False):
+            params = statement.compile(dialect=postgresql.dialect()).params
+            rows = sorted({key.rsplit("_m", 1)[1] for key in params if "_m" in key})
+            self.inserted = [
+                {"query": params[f"query_m{row}"], "provider": params[f"provider_m{row}"]} for row in rows
+            ]
+            return None
+        return self
+
+    def all(self) -> list[tuple]:
+        return self.rows
+
+
+@pytest.fixture
+def fresh_memory(monkeypatch):
+    monkeypatch.setattr(geocoding, "_memory", OrderedDict())
+    return geocoding
+
+
+def test_stand_in_misses_are_not_persisted(fresh_memory):
+    db = _GeocodeSession(rows=[])
+    points = fresh_memory.geocode_many(db, ["Mohawk", "Some Unknown Bar"], "austin")
+
+    assert points == {"Mohawk": (30.2697, -97.7361), "Some Unknown Bar": None}
+    assert [(row["query"], row["provider"]) for row in db.inserted] == [("mohawk", "gazetteer")]
+
+
+def test_misses_recorded_by_another_provider_are_asked_again(fresh_memory):
+    recent = datetime.now(tz=timezone.utc)
+    db = _GeocodeSession(rows=[("mohawk", None, None, "other-provider", recent)])
+
+    assert fresh_memory.geocode_many(db, ["Mohawk"], "austin") == {"Mohawk": (30.2697, -97.7361)}
+    assert [row["query"] for row in db.inserted] == ["mohawk"]
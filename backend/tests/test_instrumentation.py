@@ -0,0 +1,36 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from db.instrumentation import instrument_engine, track_queries
+
+
+def _engine():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    instrument_engine(engine)
+    return engine
+
+
+def _select_one(engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def test_workers_submitted_with_a_copied_context_are_counted():
+    engine = _engine()
+    with track_queries("test") as stats:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, _select_one, engine) for _ in range(8)]
+            for future in futures:
+                future.result()
+    assert stats.count == 8
+
+
+def test_bare_executor_workers_are_not_counted():
+    engine = _engine()
+    with track_queries("test") as stats:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: _select_one(engine), range(4)))
+    assert stats.count == 0
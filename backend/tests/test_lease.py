@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+import pipeline.lease as lease_module
+from pipeline.lease import LeaseLost, RunLease
+
+
+class _Result:
+    def __init__(self, rowcount: int) -> None:
+        self.rowcount = rowcount
+
+
+class _RecordingSession:
+    def __init__(self, rowcount: int) -> None:
+        self.rowcount = rowcount
+        self.statements: list = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return _Result(self.rowcount)
+
+    def commit(self) -> None:
+        pass
+
+
+def _lease(monkeypatch, rowcount: int) -> tuple[RunLease, _RecordingSession]:
+    session = _RecordingSession(rowcount)
+    monkeypatch.setattr(lease_module, "SessionLocal", lambda: session)
+    return RunLease(uuid4(), timedelta(minutes=15)), session
+
+
+def test_heartbeat_only_extends_a_live_running_lease(monkeypatch):
+    lease, session = _lease(monkeypatch, rowcount=1)
+    lease.heartbeat("search_pairs", {"searched_pairs": 3})
+
+    sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+    where = sql.split("WHERE", 1)[1]
+    assert "pipeline_runs.id" in where
+    assert "pipeline_runs.status" in where
+    assert "pipeline_runs.expires_at > now()" in where
+    assert lease.progress == {"searched_pairs": 3}
+
+
+def test_heartbeat_raises_when_lease_was_lost(monkeypatch):
+    lease, _session = _lease(monkeypatch, rowcount=0)
+    with pytest.raises(LeaseLost):
+        lease.heartbeat("draft_newsletters")
+
+
+def test_run_lease_leaves_a_lost_row_alone(monkeypatch):
+    lease, session = _lease(monkeypatch, rowcount=0)
+    monkeypatch.setattr(lease_module, "acquire_run_lease", lambda *args, **kwargs: lease)
+    with pytest.raises(LeaseLost):
+        with lease_module.run_lease("weekly"):
+            lease.heartbeat("parse_hobbies")
+    assert len(session.statements) == 1
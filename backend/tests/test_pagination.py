@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import gc
+import tracemalloc
+
+import pytest
+from sqlalchemy import Integer, Text, create_engine, insert, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+
+from db.pagination import iter_keyset_chunks
+
+ROWS = 20_000
+CHUNK_SIZE = 500
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class _Row(_Base):
+    __tablename__ = "rows"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    payload: Mapped[str] = mapped_column(Text)
+
+
+@pytest.fixture(scope="module")
+def engine():
+    # SQLite stands in for Postgres: the chunking is plain ORDER BY / WHERE key > :last / LIMIT.
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(_Row), [{"id": i, "payload": f"{i:08d}" * 128} for i in range(1, ROWS + 1)])
+    yield engine
+    engine.dispose()
+
+
+def _peak_bytes(consume) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        consume()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_chunks_cover_every_row_in_key_order(engine):
+    with Session(engine) as db:
+        chunks = list(iter_keyset_chunks(db, select(_Row.id), _Row.id, chunk_size=CHUNK_SIZE))
+    assert [len(chunk) for chunk in chunks] == [CHUNK_SIZE] * (ROWS // CHUNK_SIZE)
+    assert [row_id for chunk in chunks for row_id in chunk] == list(range(1, ROWS + 1))
+
+
+def test_keyset_chunks_keep_peak_memory_flat(engine):
+    def load_everything() -> None:
+        with Session(engine) as db:
+            rows = db.scalars(select(_Row)).all()
+            assert len(rows) == ROWS
+
+    def stream_chunks() -> None:
+        with Session(engine) as db:
+            seen = 0
+            for rows in iter_keyset_chunks(db, select(_Row), _Row.id, key=lambda row: row.id, chunk_size=CHUNK_SIZE):
+                seen += len(rows)
+            assert seen == ROWS
+
+    everything = _peak_bytes(load_everything)
+    chunked = _peak_bytes(stream_chunks)
+    assert chunked * 5 < everything
+
+
+def test_only_the_chunk_objects_are_expunged(engine):
+    with Session(engine) as db:
+        held = db.get(_Row, ROWS)
+        statement = select(_Row).where(_Row.id <= 2 * CHUNK_SIZE)
+        for rows in iter_keyset_chunks(db, statement, _Row.id, key=lambda row: row.id, chunk_size=CHUNK_SIZE):
+            chunk = rows
+        assert held in db
+        assert not any(row in db for row in chunk)
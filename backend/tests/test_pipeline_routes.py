@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import routes.pipeline as pipeline_routes
+from core.config import get_settings
+from db.session import get_async_db
+
+HEADERS = {"X-Cron-Secret": get_settings().api_cron_secret}
+
+
+class _AsyncSession:
+    async def run_sync(self, fn, *args, **kwargs):
+        return fn(None, *args, **kwargs)
+
+
+async def _async_db():
+    yield _AsyncSession()
+
+
+@pytest.fixture
+def posted(monkeypatch) -> list[str]:
+    posted: list[str] = []
+
+    async def record_post(self, url, **kwargs):
+        posted.append(str(url))
+        return httpx.Response(200)
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", record_post)
+    return posted
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(pipeline_routes.router)
+    app.dependency_overrides[get_async_db] = _async_db
+    with TestClient(app) as client:
+        yield client
+
+
+def _wait_for(posted: list[str], count: int) -> None:
+    deadline = time.monotonic() + 5
+    while len(posted) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _shard(city: str) -> SimpleNamespace:
+    return SimpleNamespace(city=city, as_dict=lambda: {"city": city})
+
+
+def test_run_shards_returns_run_group_and_fans_out(monkeypatch, client, posted):
+    monkeypatch.setattr(pipeline_routes, "plan_city_shards", lambda session: [_shard("austin"), _shard("san antonio")])
+
+    response = client.post("/api/pipeline/run-shards", headers=HEADERS)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["run_group"]) == 32
+    assert body["shards"] == [{"city": "austin"}, {"city": "san antonio"}]
+    _wait_for(posted, 2)
+    assert posted == ["http://testserver/api/pipeline/run"] * 2
+
+
+def test_run_all_dispatches_the_lease_and_fans_out(monkeypatch, client, posted):
+    user_ids = ["7f2c1d2e-0000-4000-8000-000000000001", "7f2c1d2e-0000-4000-8000-000000000002"]
+    calls: list[tuple[str, dict | None]] = []
+    lease = SimpleNamespace(
+        dispatch=lambda progress=None: calls.append(("dispatch", progress)),
+        finish=lambda status="completed", progress=None: calls.append((status, progress)),
+    )
+    monkeypatch.setattr(pipeline_routes, "acquire_run_lease", lambda kind: lease)
+    monkeypatch.setattr(pipeline_routes, "iter_keyset_chunks", lambda session, statement, column: iter([user_ids]))
+
+    response = client.post("/api/pipeline/run-all", headers=HEADERS)
+
+    assert response.status_code == 200
+    assert response.json()["users_triggered"] == 2
+    assert calls == [("dispatch", {"users_triggered": 2})]
+    _wait_for(posted, 2)
+    assert sorted(posted) == [f"http://testserver/api/pipeline/run-user/{user_id}" for user_id in user_ids]
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, select, text
+
+from core.config import normalize_database_url
+from db import Base
+from models import CityVenue, HobbyCityPair, Newsletter, OAuthToken, UserGoal, UserHobby
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+# A few thousand rows per table, shaped like production: several hobby/goal entries per user,
+# mostly-sent newsletters, many cities sharing the pair and venue tables.
+SEED = """
+INSERT INTO users (id, name, email, address, city, concision_pref, event_radius_miles, onboarding_token)
+SELECT gen_random_uuid(), 'user ' || i, 'user' || i || '@example.com', 'somewhere', 'city ' || (i % 20), 'brief', 15, 'token' || i
+FROM generate_series(1, 2000) AS i;
+
+INSERT INTO user_hobbies (id, user_id, raw_text, parsed_tags, created_at)
+SELECT gen_random_uuid(), users.id, 'music', '["music"]', now() - n * interval '1 day' FROM users, generate_series(1, 3) AS n;
+
+INSERT INTO user_goals (id, user_id, raw_text, goal_types, created_at)
+SELECT gen_random_uuid(), users.id, 'friends', '["friends"]', now() - n * interval '1 day' FROM users, generate_series(1, 3) AS n;
+
+INSERT INTO oauth_tokens (id, user_id, provider, access_token)
+SELECT gen_random_uuid(), users.id, provider, 'token' FROM users, (VALUES ('spotify'), ('google')) AS providers(provider);
+
+INSERT INTO newsletters (id, user_id, subject, html_content, events_included, sent_at)
+SELECT gen_random_uuid(), users.id, 'Weekly', '<html></html>', '[]', CASE WHEN n = 1 AND random() < 0.02 THEN NULL ELSE now() END
+FROM users, generate_series(1, 5) AS n;
+
+INSERT INTO hobby_tags (id, tag_name, search_prompt)
+SELECT gen_random_uuid(), 'tag ' || i, 'prompt' FROM generate_series(1, 200) AS i;
+
+INSERT INTO hobby_city_pairs (id, hobby_tag_id, city, frequency, cached_results)
+SELECT gen_random_uuid(), hobby_tags.id, 'city ' || c, (random() * 100)::int, '[]' FROM hobby_tags, generate_series(0, 19) AS c;
+
+INSERT INTO city_venues (id, city, venue_name, venue_type, cached_events)
+SELECT gen_random_uuid(), 'city ' || c, 'venue ' || v, CASE WHEN v % 4 = 0 THEN 'music' ELSE 'bar' END, '[]'
+FROM generate_series(0, 19) AS c, generate_series(1, 100) AS v;
+"""
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(normalize_database_url(TEST_DATABASE_URL))
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        schema = f"plan_test_{uuid.uuid4().hex[:8]}"
+        connection.execute(text(f"CREATE SCHEMA {schema}"))
+        connection.execute(text(f"SET LOCAL search_path TO {schema}, public"))
+        Base.metadata.create_all(connection)
+        for statement in SEED.split(";\n"):
+            if statement.strip():
+                connection.execute(text(statement))
+        connection.execute(text("ANALYZE"))
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+def _indexes_used(connection, statement) -> set[str]:
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+
+    found: set[str] = set()
+
+    def walk(node: dict) -> None:
+        if "Index Name" in node:
+            found.add(node["Index Name"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return found
+
+
+def _some_user_id(connection) -> uuid.UUID:
+    return connection.execute(text("SELECT id FROM users ORDER BY id LIMIT 1")).scalar_one()
+
+
+@pytest.mark.parametrize(
+    ("index_name", "build"),
+    [
+        (
+            "ix_user_hobbies_user_created_at",
+            lambda user_id: select(UserHobby).where(UserHobby.user_id == user_id).order_by(UserHobby.created_at.desc()).limit(1),
+        ),
+        (
+            "ix_user_goals_user_created_at",
+            lambda user_id: select(UserGoal).where(UserGoal.user_id == user_id).order_by(UserGoal.created_at.desc()).limit(1),
+        ),
+        (
+            "ix_oauth_tokens_user_provider",
+            lambda user_id: select(OAuthToken).where(OAuthToken.user_id == user_id, OAuthToken.provider == "spotify"),
+        ),
+        (
+            "ix_newsletters_user_created_at",
+            lambda user_id: select(Newsletter)
+            .where(Newsletter.user_id == user_id)
+            .order_by(Newsletter.created_at.desc())
+            .limit(1),
+        ),
+        (
+            "ix_newsletters_unsent",
+            lambda _user_id: select(Newsletter).where(Newsletter.sent_at.is_(None)).order_by(Newsletter.id.asc()).limit(500),
+        ),
+        (
+            "ix_hobby_city_pairs_city_frequency",
+            lambda _user_id: select(HobbyCityPair)
+            .where(HobbyCityPair.city == "city 3")
+            .order_by(HobbyCityPair.frequency.desc())
+            .limit(50),
+        ),
+        (
+            "ix_city_venues_city_type_name",
+            lambda _user_id: select(CityVenue)
+            .where(CityVenue.city == "city 3", CityVenue.venue_type == "music")
+            .order_by(CityVenue.venue_name.asc()),
+        ),
+    ],
+)
+def test_hot_queries_use_their_indexes(connection, index_name, build):
+    assert index_name in _indexes_used(connection, build(_some_user_id(connection)))
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from slowapi import _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+
+from core.rate_limit import check_rate_limit, limiter
+
+
+def test_async_route_limit_is_checked_off_the_event_loop(monkeypatch):
+    checks: list[bool] = []
+    original = limiter._check_request_limit
+
+    def recording_check(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            checks.append(True)
+        except RuntimeError:
+            checks.append(False)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(limiter, "_check_request_limit", recording_check)
+
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+    @app.post("/limited", dependencies=[Depends(check_rate_limit)])
+    @limiter.limit("2/minute")
+    async def limited_for_test(request: Request) -> dict:
+        return {"ok": True}
+
+    client = TestClient(app)
+    statuses = [client.post("/limited").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+    assert checks == [False, False, False]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from services.change_tracking import PAIR_REFRESH
+from services.refresh_planner import _staleness, _subscribers_by_city_tag, _urgency, next_send_at
+
+# A Wednesday noon in Austin.
+NOW = datetime(2026, 10, 21, 17, 0, tzinfo=timezone.utc)
+
+
+def test_next_send_is_the_coming_sunday_morning_local_time():
+    send_at = next_send_at("America/Chicago", NOW)
+    assert send_at == datetime(2026, 10, 25, 13, 0, tzinfo=timezone.utc)
+    # 8am local stays 8am across the end of daylight saving time.
+    assert next_send_at("America/Chicago", send_at) == datetime(2026, 11, 1, 14, 0, tzinfo=timezone.utc)
+
+
+def test_staleness_skips_results_still_fresh_at_send():
+    send_at = next_send_at("America/Chicago", NOW)
+    assert _staleness(PAIR_REFRESH, send_at + timedelta(hours=1), 86400, False, send_at) is None
+    assert _staleness(PAIR_REFRESH, send_at - timedelta(days=1), 86400, False, send_at) == 2.0
+    assert _staleness(PAIR_REFRESH, None, None, False, send_at) == _staleness(PAIR_REFRESH, NOW, 86400, True, send_at)
+
+
+def test_urgency_favours_sends_that_are_sooner():
+    assert _urgency(NOW, NOW) == 7
+    assert _urgency(NOW + timedelta(days=6), NOW) == 1
+
+
+class _CapturingSession:
+    def __init__(self) -> None:
+        self.sql = ""
+
+    def execute(self, statement):
+        self.sql = str(statement.compile(dialect=postgresql.dialect()))
+        return self
+
+    def all(self) -> list:
+        return []
+
+
+def test_subscriber_counts_use_only_each_users_latest_hobbies():
+    db = _CapturingSession()
+    assert _subscribers_by_city_tag(db, registry=None) == {}
+    assert "DISTINCT ON (user_hobbies.user_id)" in db.sql
+    assert "ORDER BY user_hobbies.user_id, user_hobbies.created_at DESC" in db.sql
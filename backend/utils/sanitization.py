@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import bleach
-
-
 ALLOWED_TAGS: list[str] = []
 ALLOWED_ATTRIBUTES: dict[str, list[str]] = {}
 
 
 def sanitize_text(value: str) -> str:
+    import bleach
+
     return bleach.clean(value, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)